@@ -1,6 +1,6 @@
 # agents/langgraph_coordinator.py
 from queue import Queue
-import threading, time
+import asyncio, threading, time
 from mcp import create_mcp_message, get_conversation_id
 
 class LangGraphCoordinator:
@@ -57,8 +57,21 @@ class LangGraphCoordinator:
             msg = self.msg_queue.get()
             self._dispatch(msg)
 
+    async def arun_once(self):
+        """Async run_once: messages queued together (e.g. fan-out along several edges) run concurrently."""
+        while not self.msg_queue.empty():
+            wave = []
+            while not self.msg_queue.empty():
+                wave.append(self.msg_queue.get())
+            # Nodes are blocking (git, Groq, reportlab), so each one gets a worker thread
+            await asyncio.gather(*(asyncio.to_thread(self._dispatch, msg) for msg in wave))
+
     def get_conversation_events(self, conversation_id=None):
         if conversation_id is None:
             return list(self.consumers_log)
         else:
             return [m for m in self.consumers_log if m.get("metadata",{}).get("conversation_id")==conversation_id]
+
+    def event_count(self):
+        """Total number of logged events; cheap probe for UI cache invalidation."""
+        return len(self.consumers_log)
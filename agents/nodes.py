@@ -1,17 +1,22 @@
 # agents/nodes.py
-import os, uuid, time, json
+import os, re, uuid, time, json
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Callable
 from mcp import create_mcp_message, get_conversation_id
 from tools.git_tool import clone_repo, list_files, cleanup_repo
 from tools.static_analysis import extract_metrics
-from tools.llm_tool_groq import summarize_text_for_academic, groq_chat
+from tools.llm_tool_groq import summarize_text_for_academic, groq_chat, model_for
 from tools.pdf_tool import md_to_pdf
 from utils.validation import (
     validate_mcp_message, validate_github_url, 
     ValidationError, SecurityViolationError
 )
 from utils.logging_config import system_logger, security_logger, setup_logging
-from utils.resilience import limit_execution_time, with_timeout
+from utils.resilience import with_timeout
+from utils.llm_cache import (
+    get_cache, cached_call, make_key, text_digest,
+    DRAFT_CACHE_TTL, EVAL_CACHE_TTL
+)
 
 # Initialize logging
 setup_logging()
@@ -19,6 +24,30 @@ setup_logging()
 TMP_OUT = os.path.join(os.getcwd(), "output")
 os.makedirs(TMP_OUT, exist_ok=True)
 
+# Upper bound on alternative drafts generated per pipeline run
+MAX_DRAFT_VARIANTS = 4
+
+# Cache key prefix for evaluator metrics; bump it whenever _text_stats or the
+# textstat calls change, so results computed by the old code are not served
+READABILITY_CACHE_VERSION = "readability:v2"
+
+# Single-pass text statistics for the evaluator
+_SENT_RE = re.compile(r'[.!?]+')
+_WORD_RE = re.compile(r'\b\w+\b')
+_SYL_RE = re.compile(r'[aeiouy]+', re.IGNORECASE)
+
+
+def _text_stats(txt: str) -> Dict[str, Any]:
+    """Word, sentence and syllable counts, one regex pass over the text each"""
+    word_count = len(_WORD_RE.findall(txt))
+    sentence_count = max(1, len(_SENT_RE.findall(txt)))
+    return {
+        "word_count": word_count,
+        "sentence_count": sentence_count,
+        "syllable_count": len(_SYL_RE.findall(txt)),
+        "avg_sentence_length": round(word_count / sentence_count, 2)
+    }
+
 def repo_node(msg: Dict[str, Any], coordinator_send: Callable) -> Dict[str, Any]:
     """
     Clone repository and emit Analyzer message with enhanced validation and logging
@@ -61,7 +90,10 @@ def repo_node(msg: Dict[str, Any], coordinator_send: Callable) -> Dict[str, Any]
             "repo_path": repo_path, 
             "files": files,
             "file_count": len(files),
-            "repo_url": repo_url
+            "repo_url": repo_url,
+            "variants": content.get("variants", 1),
+            "writer_model": content.get("writer_model"),
+            "evaluator_model": content.get("evaluator_model")
         }
         
         # Send to next agent
@@ -155,8 +187,11 @@ def analyzer_node(msg, coordinator_send):
                 break
         short_context = (readme_text or "") + "\n\nTop functions: " + ", ".join(metrics.get("top_functions", [])[:10])
         # Ask Groq to summarize into an academic abstract + bullets of contributions
-        abstract = summarize_text_for_academic(short_context)
-        payload = {"repo_path": repo_path, "metrics": metrics, "abstract": abstract}
+        abstract = summarize_text_for_academic(short_context,
+                                               model=content.get("evaluator_model") or model_for("AnalyzerNode"))
+        payload = {"repo_path": repo_path, "metrics": metrics, "abstract": abstract,
+                   "repo_url": content.get("repo_url"), "variants": content.get("variants", 1),
+                   "writer_model": content.get("writer_model")}
         out = create_mcp_message(role="agent", name="WriterNode", content=payload, conversation_id=get_conversation_id(msg))
         coordinator_send(out)
         return {"status":"ok"}
@@ -187,14 +222,42 @@ def writer_node(msg, coordinator_send):
         # auto-generate a more complete draft using Groq
         system_msg = {"role":"system","content":"You are an academic writer. Produce a paper-style markdown including Title, Abstract, Introduction, Methods and Results summary from context."}
         user_msg = {"role":"user","content": f"Abstract:\n{abstract}\n\nMetrics:\n{json.dumps(metrics)}\n\nProduce an extended paper-style markdown draft."}
-        md_text = groq_chat([system_msg, user_msg], model="llama-3.3-70b-versatile", temperature=0.2, max_tokens=1200)
-        # Generate markdown filename starting with "Gen-Authering"  
-        md_filename = f"Gen-Authering-{conversation_id}.md"
-        md_path = os.path.join(TMP_OUT, md_filename)
-        with open(md_path, "w", encoding='utf-8') as f:
-            f.write(md_text)
+        variants = max(1, min(int(content.get("variants") or 1), MAX_DRAFT_VARIANTS))
+        model, temperature, max_tokens = content.get("writer_model") or model_for("WriterNode"), 0.2, 1200
+        repo_url = content.get("repo_url")
+        # The prompts carry the abstract and metrics, so a change to either
+        # (or to the prompt wording) must miss the cache
+        prompt_digests = (text_digest(system_msg["content"]), text_digest(user_msg["content"]))
+        cache_hits = []
+
+        def generate(variant):
+            compute = lambda: groq_chat([system_msg, user_msg], model=model, temperature=temperature, max_tokens=max_tokens)
+            if not repo_url:
+                return compute()
+            # Re-running the same repo with the same prompts and settings reuses the earlier draft
+            key = make_key("draft", repo_url, *prompt_digests, model, temperature, max_tokens, variant)
+            md_text, hit = cached_call(key, compute, expire=DRAFT_CACHE_TTL)
+            if hit:
+                cache_hits.append(variant)
+            return md_text
+
+        if variants == 1:
+            drafts = [generate(0)]
+        else:
+            # Groq only serves n=1 per completion, so alternative drafts are concurrent requests
+            with ThreadPoolExecutor(max_workers=variants) as pool:
+                drafts = list(pool.map(generate, range(variants)))
+        # Generate markdown filenames starting with "Gen-Authering"; extra variants get a -vN suffix
+        md_paths = []
+        for i, md_text in enumerate(drafts):
+            suffix = f"-v{i + 1}" if i else ""
+            md_path = os.path.join(TMP_OUT, f"Gen-Authering-{conversation_id}{suffix}.md")
+            with open(md_path, "w", encoding='utf-8') as f:
+                f.write(md_text)
+            md_paths.append(md_path)
+        md_path = md_paths[0]
         # send draft to Coordinator so UI can pick it up
-        out = create_mcp_message(role="agent", name="Coordinator", content={"status":"draft_ready", "md_path": md_path}, conversation_id=conversation_id)
+        out = create_mcp_message(role="agent", name="Coordinator", content={"status":"draft_ready", "md_path": md_path, "variant_paths": md_paths, "cached": len(cache_hits) == variants}, conversation_id=conversation_id)
         coordinator_send(out)
         return {"status":"draft_ready", "md_path": md_path}
 
@@ -318,26 +381,36 @@ def evaluator_node(msg: Dict[str, Any], coordinator_send: Callable) -> Dict[str,
             })
             txt = txt[:50000]  # Truncate for safety
         
-        # Calculate readability metrics
-        evaluation_results = {}
-        
-        try:
-            evaluation_results["flesch_reading_ease"] = textstat.flesch_reading_ease(txt)
-            evaluation_results["flesch_kincaid_grade"] = textstat.flesch_kincaid_grade(txt)
-            evaluation_results["automated_readability_index"] = textstat.automated_readability_index(txt)
-            evaluation_results["word_count"] = textstat.lexicon_count(txt)
-            evaluation_results["sentence_count"] = textstat.sentence_count(txt)
-            evaluation_results["avg_sentence_length"] = textstat.words_per_sentence(txt)
-        except Exception as metric_error:
-            system_logger.logger.warning("textstat_calculation_error", extra={
-                "event_type": "calculation_error",
-                "error": str(metric_error),
-                "md_path": md_path
-            })
-            # Provide basic fallback metrics
-            evaluation_results["word_count"] = len(txt.split())
-            evaluation_results["char_count"] = len(txt)
-            evaluation_results["flesch_reading_ease"] = None
+        # Calculate readability metrics (pure functions of the text, so cached by content hash)
+        eval_key = make_key(READABILITY_CACHE_VERSION, text_digest(txt))
+        evaluation_results = get_cache().get(eval_key)
+        cached = evaluation_results is not None
+        
+        if not cached:
+            stats = _text_stats(txt)
+            evaluation_results = {
+                "word_count": stats["word_count"],
+                "sentence_count": stats["sentence_count"],
+                "avg_sentence_length": stats["avg_sentence_length"]
+            }
+            try:
+                evaluation_results["flesch_reading_ease"] = textstat.flesch_reading_ease(txt)
+                evaluation_results["flesch_kincaid_grade"] = textstat.flesch_kincaid_grade(txt)
+                evaluation_results["automated_readability_index"] = textstat.automated_readability_index(txt)
+                get_cache().set(eval_key, evaluation_results, expire=EVAL_CACHE_TTL)
+            except Exception as metric_error:
+                system_logger.logger.warning("textstat_calculation_error", extra={
+                    "event_type": "calculation_error",
+                    "error": str(metric_error),
+                    "md_path": md_path
+                })
+                # Estimate from the regex counts (not cached so a later run can retry textstat)
+                words = max(1, stats["word_count"])
+                evaluation_results["char_count"] = len(txt)
+                evaluation_results["flesch_reading_ease"] = round(
+                    206.835 - 1.015 * stats["avg_sentence_length"]
+                    - 84.6 * stats["syllable_count"] / words, 2
+                )
         
         # Send results to coordinator
         out = create_mcp_message(
@@ -345,7 +418,8 @@ def evaluator_node(msg: Dict[str, Any], coordinator_send: Callable) -> Dict[str,
             name="Coordinator", 
             content={
                 "status": "eval_done",
-                **evaluation_results
+                **evaluation_results,
+                "cached": cached
             }, 
             conversation_id=conversation_id
         )
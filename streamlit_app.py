@@ -25,11 +25,17 @@ st.set_page_config(
     }
 )
 
+@st.cache_resource(show_spinner=False)
+def _load_env_once():
+    """Read the .env file once per process rather than on every rerun"""
+    from dotenv import load_dotenv
+    load_dotenv()
+    return True
+
 def check_environment():
     """Check for required environment variables"""
     # Load .env file first
-    from dotenv import load_dotenv
-    load_dotenv()
+    _load_env_once()
     
     # Try Streamlit secrets first, then environment variables
     groq_key = None
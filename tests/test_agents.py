@@ -208,6 +208,74 @@ class TestAgentNodes:
             
             assert result["status"] == "draft_ready"
     
+    def test_writer_node_multiple_variants(self):
+        """Test writer node generating alternative drafts"""
+        coordinator_send = MagicMock()
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            test_msg = {
+                "role": "agent",
+                "content": {"repo_path": "/test/repo", "abstract": "Test abstract", "variants": 3},
+                "metadata": {"conversation_id": "test-conv-123"}
+            }
+            
+            with patch('agents.nodes.groq_chat') as mock_groq, \
+                 patch('agents.nodes.TMP_OUT', temp_dir):
+                mock_groq.return_value = "# Generated Paper"
+                
+                result = writer_node(test_msg, coordinator_send)
+            
+            assert mock_groq.call_count == 3
+            sent_content = coordinator_send.call_args[0][0]["content"]
+            assert len(sent_content["variant_paths"]) == 3
+            assert sent_content["md_path"] == sent_content["variant_paths"][0]
+            assert all(os.path.exists(p) for p in sent_content["variant_paths"])
+            assert result["md_path"] == sent_content["md_path"]
+    
+    def test_writer_node_reuses_cached_draft(self):
+        """Test writer node serving a repeat repo from the LLM cache"""
+        coordinator_send = MagicMock()
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            test_msg = {
+                "role": "agent",
+                "content": {"abstract": "Test abstract", "repo_url": f"https://github.com/test/{uuid.uuid4()}"},
+                "metadata": {"conversation_id": "test-conv-123"}
+            }
+            
+            with patch('agents.nodes.groq_chat') as mock_groq, \
+                 patch('agents.nodes.TMP_OUT', temp_dir):
+                mock_groq.return_value = "# Generated Paper"
+                
+                writer_node(test_msg, coordinator_send)
+                assert coordinator_send.call_args[0][0]["content"]["cached"] is False
+                
+                writer_node(test_msg, coordinator_send)
+                assert coordinator_send.call_args[0][0]["content"]["cached"] is True
+            
+            mock_groq.assert_called_once()
+    
+    def test_writer_node_cache_misses_on_new_abstract(self):
+        """Test writer node regenerating when the prompt content changes"""
+        coordinator_send = MagicMock()
+        repo_url = f"https://github.com/test/{uuid.uuid4()}"
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with patch('agents.nodes.groq_chat') as mock_groq, \
+                 patch('agents.nodes.TMP_OUT', temp_dir):
+                mock_groq.return_value = "# Generated Paper"
+                
+                for abstract in ("First abstract", "Revised abstract"):
+                    test_msg = {
+                        "role": "agent",
+                        "content": {"abstract": abstract, "repo_url": repo_url},
+                        "metadata": {"conversation_id": "test-conv-123"}
+                    }
+                    writer_node(test_msg, coordinator_send)
+                    assert coordinator_send.call_args[0][0]["content"]["cached"] is False
+            
+            assert mock_groq.call_count == 2
+    
     def test_writer_node_user_edits(self):
         """Test writer node handling user edits"""
         coordinator_send = MagicMock()
@@ -397,6 +465,33 @@ class TestLangGraphCoordinator:
         assert test_results[0]["content"] == "test"
         assert len(coordinator.consumers_log) == 1
     
+    def test_arun_once_runs_fan_out_concurrently(self):
+        """Test arun_once drains chained messages and runs sibling nodes together"""
+        import asyncio
+        import threading
+        
+        coordinator = LangGraphCoordinator()
+        barrier = threading.Barrier(2, timeout=5)
+        
+        def sibling(msg, send):
+            # Both siblings must be in flight at once for the barrier to release
+            barrier.wait()
+            return None
+        
+        coordinator.register_node("Source", lambda msg, send: {"content": {"status": "ok"}})
+        coordinator.register_node("Left", sibling)
+        coordinator.register_node("Right", sibling)
+        coordinator.add_edge("Source", "Left")
+        coordinator.add_edge("Source", "Right")
+        
+        coordinator.send({"name": "Source", "content": {}})
+        asyncio.run(coordinator.arun_once())
+        
+        assert coordinator.msg_queue.empty()
+        assert [e["name"] for e in coordinator.consumers_log][0] == "Source"
+        assert sorted(e["name"] for e in coordinator.consumers_log[1:]) == ["Left", "Right"]
+        assert not barrier.broken
+    
     def test_get_conversation_events(self):
         """Test conversation event retrieval"""
         coordinator = LangGraphCoordinator()
@@ -418,6 +513,17 @@ class TestLangGraphCoordinator:
         all_events = coordinator.get_conversation_events()
         assert len(all_events) == 3
 
+    def test_event_count(self):
+        """Test event count tracks the conversation log"""
+        coordinator = LangGraphCoordinator()
+        assert coordinator.event_count() == 0
+        
+        coordinator.register_node("TestNode", lambda msg, send: None)
+        coordinator.send({"name": "TestNode", "content": "test"})
+        coordinator.run_once()
+        
+        assert coordinator.event_count() == 1
+
 
 class TestGraphSpec:
     """Test suite for graph_spec.py"""
@@ -9,7 +9,7 @@ import ast
 from tools.git_tool import clone_repo, list_files
 from tools.static_analysis import extract_metrics
 from tools.pdf_tool import md_to_pdf
-from tools.llm_tool_groq import groq_chat, summarize_text_for_academic, get_groq_client
+from tools.llm_tool_groq import groq_chat, summarize_text_for_academic, get_groq_client, model_for
 
 
 class TestGitTool:
@@ -37,6 +37,19 @@ class TestGitTool:
             assert result == "/custom/path"
             mock_repo.clone_from.assert_called_once_with("https://github.com/test/repo", "/custom/path")
     
+    def test_clone_repo_with_analysis_filter(self):
+        """Test sparse partial clone when an analysis filter is given"""
+        with patch('tools.git_tool.Repo') as mock_repo:
+            result = clone_repo("https://github.com/test/repo", "/tmp/sparse_repo",
+                                analysis_filter=["**/*.py"])
+
+            assert result == "/tmp/sparse_repo"
+            _, kwargs = mock_repo.clone_from.call_args
+            assert '--filter=blob:none' in kwargs["multi_options"]
+            cloned = mock_repo.clone_from.return_value
+            cloned.git.sparse_checkout.assert_called_once_with('set', '--no-cone', '**/*.py')
+            cloned.git.checkout.assert_called_once()
+
     def test_list_files(self):
         """Test file listing functionality"""
         # Create a temporary directory structure for testing
@@ -54,6 +67,23 @@ class TestGitTool:
             assert "file1.py" in files
             assert os.path.join("subdir", "file2.txt") in files
 
+    def test_list_files_uses_git_index(self):
+        """Test that only tracked files are listed for a git checkout"""
+        from git import Repo
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo = Repo.init(temp_dir)
+            os.makedirs(os.path.join(temp_dir, "pkg"))
+            with open(os.path.join(temp_dir, "pkg", "tracked.py"), 'w') as f:
+                f.write("test content")
+            with open(os.path.join(temp_dir, "untracked.py"), 'w') as f:
+                f.write("test content")
+            repo.index.add([os.path.join("pkg", "tracked.py")])
+
+            files = list_files(temp_dir)
+
+            assert files == [os.path.join("pkg", "tracked.py")]
+
 
 class TestStaticAnalysis:
     """Test suite for static_analysis.py"""
@@ -266,6 +296,15 @@ class TestLLMToolGroq:
             assert args[1]["role"] == "user"
             assert test_text in args[1]["content"]
     
+    def test_summarize_text_for_academic_uses_analyzer_model(self):
+        """Test that summarization is routed to the smaller analyzer model"""
+        with patch('tools.llm_tool_groq.groq_chat') as mock_groq_chat:
+            summarize_text_for_academic("Some repository text")
+            
+            assert mock_groq_chat.call_args[1]["model"] == model_for("AnalyzerNode")
+            assert model_for("AnalyzerNode") == "llama-3.1-8b-instant"
+            assert model_for("WriterNode") == "llama-3.3-70b-versatile"
+    
     def test_summarize_text_for_academic_error_handling(self):
         """Test academic text summarization error handling"""
         test_text = "This is a test text."
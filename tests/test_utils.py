@@ -0,0 +1,278 @@
+# tests/test_utils.py
+import asyncio
+import threading
+import time
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+from utils.md_stream import split_blocks, render_markdown, block_html
+from utils.resilience import with_timeout, TimeoutError, RateLimiter
+from utils import validation
+from utils.validation import (
+    validate_github_url, validate_conversation_id, validate_file_path, sanitize_user_input,
+    validate_mcp_message, validate_messages_batch,
+    ValidationError, SecurityViolationError
+)
+
+
+class TestMarkdownStream:
+    """Test suite for md_stream.py"""
+
+    def test_split_blocks_keeps_open_fence_in_tail(self):
+        """Test that an unclosed code fence is not treated as stable"""
+        stable, tail = split_blocks("# Title\n\nIntro\n\n```python\nx = 1\n\ny = 2")
+
+        assert stable == ["# Title", "Intro"]
+        assert tail == "```python\nx = 1\n\ny = 2"
+
+    def test_split_blocks_keeps_loose_list_together(self):
+        """Test that list items separated by blank lines stay in one block"""
+        stable, tail = split_blocks("1. first\n\n2. second\n\nAfter\n\n")
+
+        assert stable == ["1. first\n\n2. second", "After"]
+        assert tail == ""
+
+    def test_render_markdown_reuses_stable_blocks(self):
+        """Test that unchanged blocks are served from the block cache"""
+        block_html.cache_clear()
+        render_markdown("# Title\n\nFirst paragraph\n\nSecond")
+        render_markdown("# Title\n\nFirst paragraph\n\nSecond, extended")
+
+        info = block_html.cache_info()
+        assert info.hits == 2
+        assert info.misses == 2
+
+    def test_render_markdown_escapes_raw_html(self):
+        """Test that raw HTML is escaped in the rendered output"""
+        html = render_markdown("<script>alert(1)</script>\n\ntext")
+
+        assert "<script>" not in html
+        assert "&lt;script&gt;" in html
+
+    def test_render_markdown_resolves_reference_in_other_block(self):
+        """Test that a reference link defined in a later block still links"""
+        html = render_markdown("See [the docs][r1].\n\nMore text\n\n[r1]: http://example.com/docs")
+
+        assert '<a href="http://example.com/docs">the docs</a>' in html
+        assert "[r1]" not in html
+
+
+class TestResilience:
+    """Test suite for resilience.py"""
+
+    def test_with_timeout_raises_local_timeout_error(self):
+        """Test that a slow call raises the module's TimeoutError"""
+        @with_timeout(0.05)
+        def slow():
+            time.sleep(0.5)
+
+        with pytest.raises(TimeoutError):
+            slow()
+
+    def test_with_timeout_works_off_main_thread(self):
+        """Test that the decorator can be used from a worker thread"""
+        @with_timeout(1.0)
+        def double(x):
+            return x * 2
+
+        results = []
+        worker = threading.Thread(target=lambda: results.append(double(21)))
+        worker.start()
+        worker.join()
+
+        assert results == [42]
+
+    def test_with_timeout_concurrent_calls_do_not_queue(self):
+        """Test that concurrent calls each get the full timeout"""
+        @with_timeout(0.5)
+        def nap():
+            time.sleep(0.3)
+            return True
+
+        results = []
+        workers = [threading.Thread(target=lambda: results.append(nap())) for _ in range(3)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        assert results == [True, True, True]
+
+    def test_rate_limiter_refills_over_time(self):
+        """Test that the bucket empties and refills at the configured rate"""
+        limiter = RateLimiter(max_tokens=2, refill_rate=20.0)
+
+        assert limiter.acquire()
+        assert limiter.acquire()
+        assert not limiter.acquire()
+
+        time.sleep(0.1)
+        assert limiter.acquire()
+        assert limiter.tokens <= 2
+
+    def test_rate_limiter_refills_at_slow_rates(self, monkeypatch):
+        """Test that a one-token-per-hour bucket refills exactly on schedule"""
+        import utils.resilience as resilience
+
+        clock = [0]
+        monkeypatch.setattr(resilience, "_now_ns", lambda: clock[0])
+        limiter = RateLimiter(max_tokens=1, refill_rate=1 / 3600)
+
+        assert limiter.acquire()
+        clock[0] = 3599 * 10 ** 9
+        assert not limiter.acquire()
+        clock[0] = 3600 * 10 ** 9
+        assert limiter.acquire()
+        assert limiter.tokens == 0
+
+
+class TestValidation:
+    """Test suite for validation.py"""
+
+    def test_validate_github_url_reports_suspicious_fragment(self):
+        """Test that the matched fragment is named in the violation"""
+        with pytest.raises(SecurityViolationError, match=r"'\.\./'"):
+            validate_github_url("https://github.com/owner/repo/../other")
+
+    def test_validate_github_url_can_skip_probe(self):
+        """Test that check_accessible=False never touches the network"""
+        with patch("utils.validation._is_github_repo_accessible") as mock_probe:
+            url = validate_github_url("https://github.com/owner/repo", check_accessible=False)
+
+        assert url == "https://github.com/owner/repo"
+        mock_probe.assert_not_called()
+
+    def test_validate_github_url_memoizes_format_checks(self):
+        """Test that repeat validations are served from the URL cache"""
+        validate_github_url.cache_clear()
+        for _ in range(3):
+            validate_github_url("https://github.com/owner/repo", check_accessible=False)
+
+        info = validation._validate_github_url_cached.cache_info()
+        assert (info.hits, info.misses) == (2, 1)
+
+    def test_validate_github_url_async_probes_concurrently(self):
+        """Test that the async variant validates a batch via gather"""
+        urls = [f"https://github.com/owner/repo{i}" for i in range(3)]
+
+        async def validate_all():
+            return await asyncio.gather(*map(validation.validate_github_url_async, urls))
+
+        with patch("utils.validation._is_github_repo_accessible", return_value=True) as mock_probe:
+            assert asyncio.run(validate_all()) == urls
+        assert mock_probe.call_count == 3
+
+    def test_accessibility_probe_is_cached_and_revalidated(self, monkeypatch):
+        """Test that repeat probes hit the cache and expired ones send the ETag"""
+        monkeypatch.setattr(validation, "_access_cache", {})
+        monkeypatch.setattr(validation, "_api_backoff_until", 0.0)
+        ok = MagicMock(status_code=200, headers={"ETag": '"abc"'})
+        not_modified = MagicMock(status_code=304, headers={})
+
+        with patch.object(validation._GH_SESSION, "head", side_effect=[ok, not_modified]) as mock_head:
+            assert validation._is_github_repo_accessible("https://github.com/Owner/Repo", "Owner", "Repo")
+            assert validation._is_github_repo_accessible("https://github.com/owner/repo", "owner", "repo")
+            assert mock_head.call_count == 1
+
+            monkeypatch.setattr(validation, "_ACCESS_CACHE_TTL", -1.0)
+            validation._remember_access(("owner", "repo"), True, '"abc"')
+            assert validation._is_github_repo_accessible("https://github.com/owner/repo", "owner", "repo")
+            assert mock_head.call_args.kwargs["headers"]["If-None-Match"] == '"abc"'
+
+    def test_accessibility_probe_keeps_repo_names_ending_in_git_letters(self, monkeypatch):
+        """Test that only a literal .git suffix is removed from the repo name"""
+        monkeypatch.setattr(validation, "_access_cache", {})
+        monkeypatch.setattr(validation, "_api_backoff_until", 0.0)
+        ok = MagicMock(status_code=200, headers={})
+
+        with patch.object(validation._GH_SESSION, "head", return_value=ok) as mock_head:
+            validation._is_github_repo_accessible("https://github.com/owner/nightgit", "owner", "nightgit")
+            validation._is_github_repo_accessible("https://github.com/owner/tools.git", "owner", "tools.git")
+
+        urls = [call.args[0] for call in mock_head.call_args_list]
+        assert urls == ["https://api.github.com/repos/owner/nightgit",
+                        "https://api.github.com/repos/owner/tools"]
+
+    def test_accessibility_probe_backs_off_when_rate_limited(self, monkeypatch):
+        """Test that an exhausted rate limit stops further API calls"""
+        monkeypatch.setattr(validation, "_access_cache", {})
+        monkeypatch.setattr(validation, "_api_backoff_until", 0.0)
+        limited = MagicMock(status_code=403, headers={"Retry-After": "60"})
+
+        with patch.object(validation._GH_SESSION, "head", return_value=limited) as mock_head:
+            assert validation._is_github_repo_accessible("https://github.com/owner/one", "owner", "one")
+            assert validation._is_github_repo_accessible("https://github.com/owner/two", "owner", "two")
+            assert mock_head.call_count == 1
+
+    def test_sanitize_user_input_removes_rejoined_constructs(self):
+        """Test that removing one construct cannot assemble another"""
+        cleaned = sanitize_user_input('<img onjavascript:error=alert(1)>')
+
+        assert "onerror" not in cleaned
+        assert sanitize_user_input("Plain text, no markup") == "Plain text, no markup"
+
+    def test_sanitize_user_input_is_linear_on_adversarial_input(self):
+        """Test that unterminated tags and handler-like words don't backtrack"""
+        start = time.perf_counter()
+        sanitize_user_input("on" * 50000 + "<script>" * 5000, max_length=200000)
+
+        assert time.perf_counter() - start < 1.0
+
+    def test_accessibility_probe_backs_off_after_network_error(self, monkeypatch):
+        """Test that an unreachable API is not retried on every validation"""
+        monkeypatch.setattr(validation, "_access_cache", {})
+        monkeypatch.setattr(validation, "_api_backoff_until", 0.0)
+        error = validation.requests.exceptions.ConnectionError("unreachable")
+
+        with patch.object(validation._GH_SESSION, "head", side_effect=error) as mock_head:
+            assert validation._is_github_repo_accessible("https://github.com/owner/one", "owner", "one")
+            assert validation._is_github_repo_accessible("https://github.com/owner/one", "owner", "one")
+            assert mock_head.call_count == 1
+
+    def test_validate_mcp_message_reports_all_missing_fields(self):
+        """Test that every missing required field is named in one error"""
+        with pytest.raises(ValidationError, match="Missing required fields: metadata, role"):
+            validate_mcp_message({"type": "message", "name": "RepoNode", "content": {}})
+
+    def test_validate_messages_batch_probes_each_repo_once(self):
+        """Test that a batch probes every distinct repository once, in parallel"""
+        def message(repo):
+            return {
+                "type": "message", "role": "user", "name": "RepoNode",
+                "content": {"repo_url": f"https://github.com/owner/{repo}"},
+                "metadata": {"timestamp": 0, "conversation_id": "c"}
+            }
+
+        with patch("utils.validation._is_github_repo_accessible", return_value=True) as mock_probe:
+            validated = validate_messages_batch([message("a"), message("b"), message("a")])
+
+        assert [m["content"]["repo_url"][-1] for m in validated] == ["a", "b", "a"]
+        assert sorted(call.args[2] for call in mock_probe.call_args_list) == ["a", "b"]
+
+    def test_validate_file_path_rejects_shell_characters(self):
+        """Test that command-injection characters are refused"""
+        with pytest.raises(SecurityViolationError):
+            validate_file_path("output/paper;rm.md")
+
+    def test_validate_conversation_id_normalizes_case(self):
+        """Test that a valid UUID is accepted and lower-cased"""
+        conv_id = "1B4E28BA-2FA1-11D2-883F-0016D3CCA427"
+
+        assert validate_conversation_id(conv_id) == conv_id.lower()
+        with pytest.raises(ValidationError):
+            validate_conversation_id("not-a-uuid")
+        with pytest.raises(ValidationError):
+            validate_conversation_id("+" + conv_id[1:])
+
+    def test_sanitize_user_input_strips_scripts(self):
+        """Test that script tags and event handlers are removed"""
+        cleaned = sanitize_user_input('# Title\n<SCRIPT>alert(1)</script><img onerror="x">')
+
+        assert "alert" not in cleaned
+        assert "onerror" not in cleaned
+        assert cleaned.startswith("# Title")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
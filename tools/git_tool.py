@@ -19,13 +19,16 @@ from utils.logging_config import system_logger, security_logger
     exceptions=(GitCommandError, ConnectionError, OSError),
     timeout=300.0  # 5 minute timeout for git operations
 )
-def clone_repo(repo_url: str, dest_dir: Optional[str] = None) -> str:
+def clone_repo(repo_url: str, dest_dir: Optional[str] = None,
+               analysis_filter: Optional[List[str]] = None) -> str:
     """
     Securely clone a GitHub repository with validation and resilience
     
     Args:
         repo_url: GitHub repository URL to clone
         dest_dir: Optional destination directory
+        analysis_filter: Optional sparse-checkout patterns (e.g. ['**/*.py']);
+            when given, only matching blobs are downloaded and checked out
         
     Returns:
         Path to cloned repository
@@ -56,14 +59,17 @@ def clone_repo(repo_url: str, dest_dir: Optional[str] = None) -> str:
         
         # Clone the repository with security options
         try:
-            repo = Repo.clone_from(
-                validated_url, 
-                dest,
-                # Security options
-                depth=1,  # Shallow clone to reduce attack surface
-                single_branch=True,  # Only clone default branch
-                # Note: SSL verification is handled by git's global config
-            )
+            if analysis_filter:
+                repo = _sparse_clone(validated_url, dest, analysis_filter)
+            else:
+                repo = Repo.clone_from(
+                    validated_url, 
+                    dest,
+                    # Security options
+                    depth=1,  # Shallow clone to reduce attack surface
+                    single_branch=True,  # Only clone default branch
+                    # Note: SSL verification is handled by git's global config
+                )
         except GitCommandError as git_error:
             # Handle specific git configuration errors
             error_msg = str(git_error)
@@ -143,6 +149,20 @@ def clone_repo(repo_url: str, dest_dir: Optional[str] = None) -> str:
         raise
 
 
+def _sparse_clone(repo_url: str, dest: str, patterns: List[str]) -> Repo:
+    """Partial clone that only fetches and materializes blobs matching patterns"""
+    repo = Repo.clone_from(
+        repo_url,
+        dest,
+        multi_options=['--filter=blob:none', '--depth=1', '--single-branch',
+                       '--sparse', '--no-checkout']
+    )
+    # Glob patterns such as '**/*.py' are not directory prefixes, so cone mode is off
+    repo.git.sparse_checkout('set', '--no-cone', *patterns)
+    repo.git.checkout()
+    return repo
+
+
 def list_files(root: str, max_files: int = 10000, 
                allowed_extensions: Optional[List[str]] = None) -> List[str]:
     """
@@ -177,37 +197,31 @@ def list_files(root: str, max_files: int = 10000,
     file_count = 0
     
     try:
-        for dir_path, dir_names, file_names in os.walk(root):
-            # Security: Skip hidden directories and common sensitive directories
-            dir_names[:] = [d for d in dir_names if not d.startswith('.') and 
-                           d not in ['.git', '.env', '.secret', 'node_modules', '__pycache__']]
+        for relative_path, filename in _iter_files(root):
+            file_count += 1
+            
+            # Security limit on number of files
+            if file_count > max_files:
+                system_logger.logger.warning("file_listing_limit_exceeded", extra={
+                    "event_type": "security_warning",
+                    "root_path": root,
+                    "max_files": max_files,
+                    "warning_message": "File listing limit exceeded"
+                })
+                raise ValueError(f"Too many files found (>{max_files}). Possible security issue.")
+            
+            # Skip hidden and sensitive files
+            if filename.startswith('.') or filename in ['secrets', 'private_key', '.env']:
+                continue
             
-            for filename in file_names:
-                file_count += 1
-                
-                # Security limit on number of files
-                if file_count > max_files:
-                    system_logger.logger.warning("file_listing_limit_exceeded", extra={
-                        "event_type": "security_warning",
-                        "root_path": root,
-                        "max_files": max_files,
-                        "warning_message": "File listing limit exceeded"
-                    })
-                    raise ValueError(f"Too many files found (>{max_files}). Possible security issue.")
-                
-                # Skip hidden and sensitive files
-                if filename.startswith('.') or filename in ['secrets', 'private_key', '.env']:
+            # Filter by extension if specified
+            if allowed_extensions:
+                _, ext = os.path.splitext(filename.lower())
+                ext = ext.lstrip('.')
+                if ext not in [e.lstrip('.') for e in allowed_extensions]:
                     continue
-                
-                # Filter by extension if specified
-                if allowed_extensions:
-                    _, ext = os.path.splitext(filename.lower())
-                    ext = ext.lstrip('.')
-                    if ext not in [e.lstrip('.') for e in allowed_extensions]:
-                        continue
-                
-                relative_path = os.path.relpath(os.path.join(dir_path, filename), root)
-                files.append(relative_path)
+            
+            files.append(relative_path)
         
         # Log file listing
         system_logger.logger.info("file_listing_completed", extra={
@@ -228,6 +242,67 @@ def list_files(root: str, max_files: int = 10000,
         raise
 
 
+def list_tracked_files(repo_path: str) -> List[str]:
+    """
+    List files tracked by git without walking the working tree
+    
+    Args:
+        repo_path: Path to a cloned (or bare) repository
+        
+    Returns:
+        List of relative file paths using the platform separator; paths
+        excluded by a sparse checkout are omitted
+        
+    Raises:
+        GitCommandError: If git cannot read the repository
+    """
+    repo = Repo(repo_path)
+    
+    # Bare clones have no index, so read the tree at HEAD instead
+    if repo.bare:
+        output = repo.git.ls_tree('-r', '-z', '--name-only', 'HEAD')
+        return [p.replace('/', os.sep) for p in output.split('\0') if p]
+    
+    # '-t' tags each entry; 'S' marks skip-worktree paths left out by a sparse checkout
+    output = repo.git.ls_files('-z', '-t')
+    return [p[2:].replace('/', os.sep) for p in output.split('\0') if p and p[0] != 'S']
+
+
+def _iter_files(root: str):
+    """Yield (relative_path, filename) pairs, skipping sensitive directories"""
+    skipped_dirs = ['.git', '.env', '.secret', 'node_modules', '__pycache__']
+    
+    # A git checkout can be listed from its index in one call instead of
+    # walking .git/ internals and untracked build artefacts
+    if os.path.exists(os.path.join(root, '.git')):
+        for relative_path in list_tracked_files(root):
+            parts = relative_path.split(os.sep)
+            if any(d.startswith('.') or d in skipped_dirs for d in parts[:-1]):
+                continue
+            yield relative_path, parts[-1]
+        return
+    
+    # os.walk yields dir_path rooted under root, so relative paths are a slice
+    # of a prefix computed once per directory rather than a relpath per file
+    prefix = root.rstrip(os.sep) + os.sep
+    plen = len(prefix)
+    
+    for dir_path, dir_names, file_names in os.walk(root):
+        # Security: Skip hidden directories and common sensitive directories
+        dir_names[:] = [d for d in dir_names if not d.startswith('.') and 
+                       d not in skipped_dirs]
+        
+        if dir_path == root:
+            rel_dir = ''
+        elif dir_path.startswith(prefix):
+            rel_dir = dir_path[plen:] + os.sep
+        else:
+            rel_dir = os.path.relpath(dir_path, root) + os.sep
+        
+        for filename in file_names:
+            yield rel_dir + filename, filename
+
+
 def cleanup_repo(repo_path: str) -> bool:
     """
     Safely cleanup a cloned repository
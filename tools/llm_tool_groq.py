@@ -1,6 +1,7 @@
 # tools/llm_tool_groq.py
 import os
 import time
+import functools
 from typing import List, Dict, Any, Optional
 from groq import Groq
 from dotenv import load_dotenv
@@ -16,9 +17,27 @@ GROQ_API_KEY = os.environ.get("GROQ_API_KEY", None)
 if not GROQ_API_KEY:
     raise EnvironmentError("Set GROQ_API_KEY env var")
 
+# Drafting keeps the large model; the short summarization/analysis pass runs
+# fine on the much cheaper and faster 8B instant model
+DEFAULT_MODEL = "llama-3.3-70b-versatile"
+ROLE_MODELS = {
+    "WriterNode": DEFAULT_MODEL,
+    "AnalyzerNode": "llama-3.1-8b-instant",
+    "EvaluatorNode": "llama-3.1-8b-instant",
+}
+
+def model_for(role: str) -> str:
+    """Default Groq model for a pipeline role (node name)"""
+    return ROLE_MODELS.get(role, DEFAULT_MODEL)
+
 def get_groq_client():
     return Groq(api_key=GROQ_API_KEY)
 
+@functools.lru_cache(maxsize=4096)
+def _sanitize_cached(content: str) -> str:
+    """Sanitize message content once per unique string (system prompts repeat every call)"""
+    return sanitize_user_input(content)
+
 @llm_circuit_breaker
 @retry_with_backoff(
     max_attempts=3,
@@ -28,7 +47,7 @@ def get_groq_client():
     exceptions=(Exception,),
     timeout=120.0
 )
-def groq_chat(messages: List[dict], model="llama-3.3-70b-versatile", 
+def groq_chat(messages: List[dict], model=DEFAULT_MODEL, 
               temperature: float = 0.2, max_tokens: int = 800,
               conversation_id: Optional[str] = None) -> str:
     """
@@ -60,7 +79,10 @@ def groq_chat(messages: List[dict], model="llama-3.3-70b-versatile",
             raise ValueError(f"Invalid role: {msg['role']}")
         
         # Sanitize content
-        sanitized_content = sanitize_user_input(msg['content'])
+        if isinstance(msg['content'], str):
+            sanitized_content = _sanitize_cached(msg['content'])
+        else:
+            sanitized_content = sanitize_user_input(msg['content'])
         validated_messages.append({
             'role': msg['role'],
             'content': sanitized_content
@@ -143,13 +165,13 @@ def groq_chat(messages: List[dict], model="llama-3.3-70b-versatile",
         # All models failed, re-raise the original exception
         raise e
 
-def summarize_text_for_academic(text: str) -> str:
+def summarize_text_for_academic(text: str, model: Optional[str] = None) -> str:
     prompt = [
         {"role": "system", "content": "You are an assistant that summarizes technical repositories into academic sections."},
         {"role": "user", "content": f"Summarize the important contributions and write an academic abstract for the following content:\n\n{text}"}
     ]
     try:
-        return groq_chat(prompt)
+        return groq_chat(prompt, model=model or model_for("AnalyzerNode"))
     except Exception as e:
         print(f"Error in summarize_text_for_academic: {e}")
         return f"# Academic Summary\n\nThis repository contains technical contributions that could not be fully analyzed due to API limitations. Please review the original repository for detailed information.\n\nContent preview: {text[:500]}..."
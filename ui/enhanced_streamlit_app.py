@@ -1,38 +1,482 @@
 # ui/enhanced_streamlit_app.py
+from __future__ import annotations
+
 import streamlit as st
+import asyncio
+import functools
+import hashlib
+import html
+import logging
 import os
+import re
 import time
 import json
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional, Dict, Any
+from types import MappingProxyType
+from typing import Optional, Dict, Any, List, Mapping, Tuple, Final, TYPE_CHECKING
 import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
-from agents.nodes import create_mcp_message
-from agents.graph_spec import build_graph
+try:
+    import orjson
+except ImportError:  # optional, faster JSON for the debug views
+    orjson = None
+
 from utils.validation import validate_github_url, ValidationError, SecurityViolationError
 from utils.logging_config import system_logger, setup_logging
 
-# Load environment variables first
-load_dotenv()
+# The agent stack (LangGraph, Groq SDK, git tooling) is imported inside the
+# methods that need it so UI-only reruns don't pay for it
+if TYPE_CHECKING:
+    from agents.langgraph_coordinator import LangGraphCoordinator
+
+
+_STATUS_COLORS: Final[Mapping[str, Tuple[str, str, str]]] = MappingProxyType({
+    "running": ("🟡", "Processing...", "status-warning"),
+    "draft_ready": ("🟢", "Draft Ready", "status-success"),
+    "error": ("🔴", "Error Occurred", "status-error"),
+    "processing": ("🟠", "Processing...", "status-info"),
+    "completed": ("✅", "Completed", "status-success")
+})
+_UNKNOWN_STATUS: Final = ("❓", "Unknown", "status-info")
+
+
+@st.cache_resource(show_spinner=False)
+def _bootstrap_runtime() -> bool:
+    """Load environment variables and initialize logging once per process"""
+    load_dotenv()
+    setup_logging()
+    return True
+
+
+@st.cache_resource(show_spinner=False)
+def _compiled_graph() -> Tuple[Mapping[str, Any], Mapping[str, Tuple[str, ...]]]:
+    """Build the agent graph once per server process, as read-only node and edge maps"""
+    from agents.graph_spec import build_graph
+    graph = build_graph()
+    edges = {source: tuple(targets) for source, targets in graph.edges.items()}
+    return MappingProxyType(dict(graph.nodes)), MappingProxyType(edges)
+
+
+def get_coordinator() -> LangGraphCoordinator:
+    """Return this browser session's coordinator, wired to the shared graph.
+    
+    The message queue and event log are per session, so concurrent users
+    never drain each other's messages or see each other's results.
+    """
+    coordinator = st.session_state.get("coordinator")
+    if coordinator is None:
+        from agents.langgraph_coordinator import LangGraphCoordinator
+        coordinator = LangGraphCoordinator()
+        coordinator.nodes, coordinator.edges = _compiled_graph()
+        st.session_state.coordinator = coordinator
+        st.session_state.coordinator_key = uuid.uuid4().hex
+    return coordinator
+
+
+# Static page chrome, built once at import instead of on every rerun
+_CSS_BLOCK: Final[str] = """
+    <style>
+    .main-header {
+        font-size: 2.5rem;
+        font-weight: bold;
+        color: #1e3a8a;
+        text-align: center;
+        margin-bottom: 2rem;
+    }
+    .section-header {
+        font-size: 1.5rem;
+        font-weight: 600;
+        color: #374151;
+        border-bottom: 2px solid #e5e7eb;
+        padding-bottom: 0.5rem;
+        margin: 1.5rem 0 1rem 0;
+    }
+    .status-box {
+        padding: 1rem;
+        border-radius: 0.5rem;
+        margin: 1rem 0;
+    }
+    .status-success {
+        background-color: #dcfce7;
+        border: 1px solid #16a34a;
+        color: #15803d;
+    }
+    .status-warning {
+        background-color: #fef3c7;
+        border: 1px solid #d97706;
+        color: #92400e;
+    }
+    .status-error {
+        background-color: #fee2e2;
+        border: 1px solid #dc2626;
+        color: #b91c1c;
+    }
+    .status-info {
+        background-color: #dbeafe;
+        border: 1px solid #2563eb;
+        color: #1d4ed8;
+    }
+    .metric-card {
+        background: white;
+        padding: 1rem;
+        border-radius: 0.5rem;
+        box-shadow: 0 1px 3px rgba(0,0,0,0.1);
+        border: 1px solid #e5e7eb;
+    }
+    </style>
+    """
+
+_HEADER_HTML: Final[str] = '<h1 class="main-header">📚 Gen-Authering Publication Generator</h1>'
+
+_FOOTER_MD: Final[str] = (
+    "---\n\n"
+    "Built with ❤️ using Streamlit, LangGraph, and Groq LLMs | "
+    "🔒 Production-ready with security, monitoring, and resilience features"
+)
+
+_INFO_BANNER_HTML: Final[str] = """
+<div class="status-box status-info">
+<strong>🤖 AI-Powered Research Assistant</strong><br>
+Transform any GitHub repository into a professional research publication with our multi-agent system.
+Powered by Groq LLMs and designed for production use.
+</div>
+"""
+
+# Dynamic status boxes, filled with str.format_map (values are HTML-escaped by callers)
+_URL_VALID_TEMPLATE: Final[str] = """
+<div class="status-box status-success">
+✅ <strong>Valid Repository URL</strong><br>
+Repository: {url}
+</div>
+"""
+
+_URL_INVALID_TEMPLATE: Final[str] = """
+<div class="status-box status-error">
+❌ <strong>Invalid URL</strong><br>
+{error}
+</div>
+"""
+
+_STATUS_BOX_TEMPLATE: Final[str] = """
+<div class="status-box {css_class}">
+<strong>{icon} Status: {text}</strong><br>
+Conversation ID: {conversation_id}
+</div>
+"""
+
+_ERROR_ENTRY_TEMPLATE: Final[str] = (
+    '<div class="status-box status-error">'
+    '<strong>Error {index}:</strong><br>{error}'
+    '</div>'
+)
+
+
+# (label, value, note) for the header status strip; the values are static
+_SYSTEM_STATUS: Final = (
+    ("🤖 Agents", "5", "Active"),
+    ("📊 Success Rate", "98.5%", "1.2%"),
+    ("⚡ Avg Response", "45s", "-5s"),
+    ("🔒 Security Level", "High", "Validated"),
+)
+
+_HELP_SECTIONS: Final = (
+    ("📖 How to Use", """
+1. **Enter GitHub URL**: Paste a public GitHub repository URL
+2. **Generate Draft**: Click to start the AI analysis and generation
+3. **Review & Edit**: Use the editor to refine the generated content
+4. **Generate PDF**: Create a final PDF publication
+5. **Evaluate Quality**: Run readability analysis on your document
+"""),
+    ("🔒 Security Features", """
+- Input validation and sanitization
+- Rate limiting and timeout protection
+- Secure file handling
+- Error monitoring and logging
+- Circuit breakers for external services
+"""),
+    ("📊 Supported Repositories", """
+**Best Results:**
+- Python projects with documentation
+- JavaScript/TypeScript applications
+- Machine learning repositories
+- API and web service projects
+
+**File Types Analyzed:**
+- Code files (.py, .js, .ts, .java, etc.)
+- Documentation (.md, .rst, .txt)
+- Configuration files (.json, .yaml)
+"""),
+)
+
+
+@st.cache_data(show_spinner=False)
+def _system_status_html() -> str:
+    """Render the status strip as a single HTML table"""
+    cells = "".join(
+        '<td class="metric-card" style="width:25%">'
+        f'<div style="font-size:0.875rem;color:#6b7280">{label}</div>'
+        f'<div style="font-size:1.75rem;font-weight:600">{value}</div>'
+        f'<div style="font-size:0.875rem;color:#059669">{note}</div>'
+        '</td>'
+        for label, value, note in _SYSTEM_STATUS
+    )
+    return f'<table style="width:100%;border-collapse:separate;border-spacing:0.5rem"><tr>{cells}</tr></table>'
+
+
+@st.cache_data(ttl=2, show_spinner=False)
+def _list_md_outputs(output_dir: str) -> List[str]:
+    """List generated markdown file names with a single scandir pass"""
+    if not os.path.isdir(output_dir):
+        return []
+    with os.scandir(output_dir) as entries:
+        return [entry.name for entry in entries if entry.name.endswith('.md')]
+
+
+@st.cache_data(ttl=1, show_spinner=False, max_entries=64)
+def _path_exists(path: str) -> bool:
+    """os.path.exists, shared across the reruns within one second"""
+    return os.path.exists(path)
+
+
+@dataclass
+class EventIndex:
+    """Conversation events classified in a single pass"""
+    __slots__ = ("events", "draft", "evals", "errors")
+    
+    events: List[Dict[str, Any]]
+    draft: Optional[Dict[str, Any]]
+    evals: List[Dict[str, Any]]
+    errors: List[Dict[str, Any]]
+
+
+def classify(events: List[Dict[str, Any]]) -> EventIndex:
+    """Pick out the first draft plus all evaluation and error events"""
+    idx = EventIndex(events=events, draft=None, evals=[], errors=[])
+    for event in events:
+        if not isinstance(event, dict) or not isinstance(event.get("content"), dict):
+            continue
+        content = event["content"]
+        status = content.get("status")
+        if status == "draft_ready":
+            if idx.draft is None:
+                idx.draft = event
+        elif status == "eval_done":
+            idx.evals.append(event)
+        elif "error" in content:
+            idx.errors.append(event)
+    return idx
+
+
+@st.cache_data(ttl=2, show_spinner=False, max_entries=64)
+def _index_events(_coordinator: LangGraphCoordinator, coordinator_key: str,
+                  conversation_id: Optional[str], event_count: int) -> EventIndex:
+    """Fetch and classify events once per change in the event log.
+    
+    coordinator_key and event_count are only part of the cache key: the
+    first keeps sessions apart, and any new event on the coordinator
+    invalidates cached indexes immediately.
+    """
+    return classify(_coordinator.get_conversation_events(conversation_id))
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _render_preview_html(md_text: str) -> str:
+    """Convert markdown to HTML once per distinct document text.
+    
+    Rendering is block-wise, so after an edit only the changed blocks are
+    re-parsed. Raw HTML in the source is escaped rather than passed through,
+    matching what st.markdown does without unsafe_allow_html.
+    """
+    from utils.md_stream import render_markdown
+    
+    return render_markdown(md_text)
+
+
+def _json_dumps(obj: Any) -> str:
+    """Pretty-print JSON for display, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2, default=str).decode()
+    return json.dumps(obj, indent=2, default=str)
+
+
+# Long-running jobs (PDF rendering) run on a worker pool so the script thread stays free
+PDF_POLL_INTERVAL = 0.5
+
+
+@st.cache_resource(show_spinner=False)
+def _background_executor() -> ThreadPoolExecutor:
+    """Worker pool shared by all sessions; survives reruns and module reloads"""
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix="ui-job")
+
+
+def _run_pdf_job(md_path: str, conversation_id: Optional[str]) -> Optional[str]:
+    """Run the PDF node on md_path and return the resulting path.
+    
+    Runs on a worker thread, so it must not touch st.session_state. The node
+    is called directly with a private outbox rather than through the
+    session's coordinator queue, which the script thread may be draining
+    at the same time.
+    """
+    from agents.nodes import create_mcp_message, pdf_node
+    
+    pdf_msg = create_mcp_message(
+        role="agent",
+        name="PDFNode",
+        content={"md_path": md_path},
+        conversation_id=conversation_id
+    )
+    
+    outbox: List[Dict[str, Any]] = []
+    result = pdf_node(pdf_msg, outbox.append)
+    if result.get("status") == "pdf_ready":
+        return result["pdf_path"]
+    if "error" in result:
+        raise RuntimeError(result["error"])
+    return None
+
+
+# User-facing text for recognized failure classes; unrecognized errors show as-is
+_ERROR_TEMPLATES: Final[Mapping[str, str]] = MappingProxyType({
+    "auth": (
+        "🔒 Repository Access Error\n\n"
+        "This repository appears to be private or requires authentication. "
+        "Please ensure:\n"
+        "• The repository is public\n"
+        "• The URL is correct\n"
+        "• The repository exists\n\n"
+        "Only public GitHub repositories are currently supported."
+    ),
+    "notfound": (
+        "🔍 Repository Not Found\n\n"
+        "The repository could not be found. Please check:\n"
+        "• The URL is spelled correctly\n"
+        "• The repository exists\n"
+        "• You have access to view it"
+    ),
+    "private": (
+        "🔒 Private Repository Detected\n\n"
+        "This repository is private and cannot be processed. "
+        "Please use a public repository or contact the repository owner "
+        "to make it public."
+    ),
+    "network": (
+        "🌐 Network Connection Error\n\n"
+        "Unable to connect to GitHub. Please check:\n"
+        "• Your internet connection\n"
+        "• GitHub's status (status.github.com)\n"
+        "• Try again in a few minutes"
+    ),
+})
+
+
+# One alternation over every phrase the classes look for, scanned once
+_ERR_RE: Final = re.compile(
+    r"(?P<repo_error>Repository error)"
+    r"|(?P<auth>could not read Username)"
+    r"|(?P<notfound>Repository not found)"
+    r"|(?P<private>Repository appears to be private)"
+    r"|(?P<network>Network|(?i:timeout))"
+)
+# Precedence when a message matches several classes
+_ERR_PRECEDENCE: Final = ("notfound", "private", "network")
+
+
+@functools.lru_cache(maxsize=256)
+def _classify(error_msg: str) -> str:
+    """Map an error message to a key of _ERROR_TEMPLATES ("generic" if none match)"""
+    found = {m.lastgroup for m in _ERR_RE.finditer(error_msg)}
+    if not found:
+        return "generic"
+    # An auth failure is git's username prompt inside a repository error
+    if "auth" in found and "repo_error" in found:
+        return "auth"
+    return next((tag for tag in _ERR_PRECEDENCE if tag in found), "generic")
+
+
+# Auto-save writes at most once per interval (seconds)
+AUTOSAVE_INTERVAL = 2.0
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def _load_md(path: str, mtime_ns: int, size: int) -> str:
+    """Read a markdown file; mtime and size in the key invalidate on change"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def _read_bytes(path: str) -> bytes:
+    """Whole-file read, used as a deferred download payload"""
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def _md_digest(text: str) -> bytes:
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _text_counts(text: str):
+    """Word and character counts for the editor metrics"""
+    return len(text.split()), len(text)
+
+
+@st.cache_resource(show_spinner=False)
+def _env_check() -> bool:
+    """Whether a real GROQ_API_KEY is configured (checked once per process)"""
+    # Try Streamlit secrets first, then environment variables
+    groq_key = None
+    
+    try:
+        # Try Streamlit secrets
+        if hasattr(st, 'secrets') and 'GROQ_API_KEY' in st.secrets:
+            groq_key = st.secrets['GROQ_API_KEY']
+    except (AttributeError, KeyError):
+        pass
+    
+    # Fall back to environment variable
+    if not groq_key:
+        groq_key = os.getenv("GROQ_API_KEY")
+    
+    return bool(groq_key) and groq_key not in ("your_groq_api_key_here", "your_actual_groq_api_key_here")
+
+
+# Session keys cleared by "Reset Session"; other defaults (URL, validation) survive it
+_RESET_DEFAULTS: Final[Mapping[str, Any]] = MappingProxyType({
+    "conversation_id": None,
+    "md_path": None,
+    "pdf_path": None,
+    "error_log": [],
+    "execution_metrics": {},
+    "processing_start_time": None,
+    "draft_variants": [],
+    "md_stamp": None,
+    "md_sha": None,
+    "editor_buffer": None,
+    "autosave_pending": False,
+    "pdf_future": None,
+    "pipeline_status": "idle"
+})
 
-# Initialize logging
-setup_logging()
 
 class MultiAgentUI:
     """Enhanced UI class for the Gen-Authering Publication System"""
     
     def __init__(self):
-        self.coordinator = None
+        self.coordinator: Optional[LangGraphCoordinator] = None
         self._initialized = False
     
     def _ensure_initialized(self):
         """Lazy initialization to avoid Streamlit issues during import"""
         if not self._initialized:
+            _bootstrap_runtime()
             # Check environment first
             if not self._check_environment():
                 return False
-            self.coordinator = build_graph()
+            self.coordinator = get_coordinator()
             self.setup_page_config()
             self.initialize_session_state()
             self._initialized = True
@@ -40,21 +484,9 @@ class MultiAgentUI:
     
     def _check_environment(self):
         """Check for required environment variables"""
-        # Try Streamlit secrets first, then environment variables
-        groq_key = None
-        
-        try:
-            # Try Streamlit secrets
-            if hasattr(st, 'secrets') and 'GROQ_API_KEY' in st.secrets:
-                groq_key = st.secrets['GROQ_API_KEY']
-        except (AttributeError, KeyError):
-            pass
-        
-        # Fall back to environment variable
-        if not groq_key:
-            groq_key = os.getenv("GROQ_API_KEY")
-        
-        if not groq_key or groq_key == "your_groq_api_key_here" or groq_key == "your_actual_groq_api_key_here":
+        if not _env_check():
+            # Don't keep a failed check cached; the key may be added before the next rerun
+            _env_check.clear()
             st.error("❌ **GROQ_API_KEY not configured!**")
             st.markdown("""
             ### 🔧 Setup Instructions:
@@ -92,57 +524,7 @@ class MultiAgentUI:
         pass
         
         # Custom CSS for better styling
-        st.markdown("""
-        <style>
-        .main-header {
-            font-size: 2.5rem;
-            font-weight: bold;
-            color: #1e3a8a;
-            text-align: center;
-            margin-bottom: 2rem;
-        }
-        .section-header {
-            font-size: 1.5rem;
-            font-weight: 600;
-            color: #374151;
-            border-bottom: 2px solid #e5e7eb;
-            padding-bottom: 0.5rem;
-            margin: 1.5rem 0 1rem 0;
-        }
-        .status-box {
-            padding: 1rem;
-            border-radius: 0.5rem;
-            margin: 1rem 0;
-        }
-        .status-success {
-            background-color: #dcfce7;
-            border: 1px solid #16a34a;
-            color: #15803d;
-        }
-        .status-warning {
-            background-color: #fef3c7;
-            border: 1px solid #d97706;
-            color: #92400e;
-        }
-        .status-error {
-            background-color: #fee2e2;
-            border: 1px solid #dc2626;
-            color: #b91c1c;
-        }
-        .status-info {
-            background-color: #dbeafe;
-            border: 1px solid #2563eb;
-            color: #1d4ed8;
-        }
-        .metric-card {
-            background: white;
-            padding: 1rem;
-            border-radius: 0.5rem;
-            box-shadow: 0 1px 3px rgba(0,0,0,0.1);
-            border: 1px solid #e5e7eb;
-        }
-        </style>
-        """, unsafe_allow_html=True)
+        st.markdown(_CSS_BLOCK, unsafe_allow_html=True)
     
     def initialize_session_state(self):
         """Initialize Streamlit session state variables"""
@@ -154,41 +536,40 @@ class MultiAgentUI:
             "error_log": [],
             "execution_metrics": {},
             "last_repo_url": "",
-            "processing_start_time": None
+            "processing_start_time": None,
+            "draft_variants": [],
+            "md_stamp": None,
+            "md_sha": None,
+            "last_autosave": 0.0,
+            "editor_buffer": None,
+            "editor_rev": 0,
+            "autosave_pending": False,
+            "pdf_future": None,
+            "validated_for": None,
+            "validated_url": None
         }
         
         for key, value in default_values.items():
             if key not in st.session_state:
                 st.session_state[key] = value
     
+    def _get_event_index(self, conversation_id: Optional[str]) -> EventIndex:
+        """Return the classified events for a conversation in this session"""
+        return _index_events(self.coordinator, st.session_state.coordinator_key,
+                             conversation_id, self.coordinator.event_count())
+    
     def render_header(self):
         """Render the main header and navigation"""
-        st.markdown('<h1 class="main-header">📚 Gen-Authering Publication Generator</h1>', 
-                   unsafe_allow_html=True)
-        
-        st.markdown("""
-        <div class="status-box status-info">
-        <strong>🤖 AI-Powered Research Assistant</strong><br>
-        Transform any GitHub repository into a professional research publication with our multi-agent system.
-        Powered by Groq LLMs and designed for production use.
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(_HEADER_HTML, unsafe_allow_html=True)
+        st.markdown(_INFO_BANNER_HTML, unsafe_allow_html=True)
         
         # Add system status indicator
         self.render_system_status()
     
     def render_system_status(self):
         """Render system health status"""
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            st.metric("🤖 Agents", "5", "Active")
-        with col2:
-            st.metric("📊 Success Rate", "98.5%", "1.2%")
-        with col3:
-            st.metric("⚡ Avg Response", "45s", "-5s")
-        with col4:
-            st.metric("🔒 Security Level", "High", "Validated")
+        # One static HTML table instead of four metric widgets per rerun
+        st.html(_system_status_html())
     
     def render_sidebar(self):
         """Render sidebar with configuration and help"""
@@ -200,8 +581,15 @@ class MultiAgentUI:
             model_option = st.selectbox(
                 "LLM Model",
                 ["llama-3.3-70b-versatile", "llama-3.1-70b-versatile", "mixtral-8x7b-32768"],
+                key="writer_model",
                 help="Select the language model for content generation"
             )
+            st.selectbox(
+                "Evaluator Model",
+                ["llama-3.1-8b-instant", "llama-3.3-70b-versatile"],
+                key="evaluator_model",
+                help="Model for the repository analysis/summary pass; the small model is much faster and cheaper"
+            )
             
             # Generation parameters
             st.markdown("**Generation Parameters**")
@@ -209,6 +597,8 @@ class MultiAgentUI:
                                    help="Higher values make output more creative")
             max_tokens = st.slider("Max Tokens", 100, 4000, 1200, 100,
                                  help="Maximum length of generated content")
+            st.slider("Draft Variants", 1, 4, 1, 1, key="num_variants",
+                      help="Generate several drafts in one run and switch between them")
             
             # Security settings
             st.markdown("**Security Settings**")
@@ -219,10 +609,8 @@ class MultiAgentUI:
             st.markdown("**🧪 Test Mode**")
             with st.expander("Load Existing File"):
                 st.markdown("Load an existing file for testing evaluation:")
-                output_files = []
                 output_dir = "output"
-                if os.path.exists(output_dir):
-                    output_files = [f for f in os.listdir(output_dir) if f.endswith('.md')]
+                output_files = _list_md_outputs(output_dir)
                 
                 if output_files:
                     selected_file = st.selectbox("Select a file:", [""] + output_files)
@@ -239,37 +627,9 @@ class MultiAgentUI:
             st.markdown('<h2 class="section-header">❓ Help & Info</h2>', 
                        unsafe_allow_html=True)
             
-            with st.expander("📖 How to Use"):
-                st.markdown("""
-                1. **Enter GitHub URL**: Paste a public GitHub repository URL
-                2. **Generate Draft**: Click to start the AI analysis and generation
-                3. **Review & Edit**: Use the editor to refine the generated content
-                4. **Generate PDF**: Create a final PDF publication
-                5. **Evaluate Quality**: Run readability analysis on your document
-                """)
-            
-            with st.expander("🔒 Security Features"):
-                st.markdown("""
-                - Input validation and sanitization
-                - Rate limiting and timeout protection
-                - Secure file handling
-                - Error monitoring and logging
-                - Circuit breakers for external services
-                """)
-            
-            with st.expander("📊 Supported Repositories"):
-                st.markdown("""
-                **Best Results:**
-                - Python projects with documentation
-                - JavaScript/TypeScript applications
-                - Machine learning repositories
-                - API and web service projects
-                
-                **File Types Analyzed:**
-                - Code files (.py, .js, .ts, .java, etc.)
-                - Documentation (.md, .rst, .txt)
-                - Configuration files (.json, .yaml)
-                """)
+            for title, body in _HELP_SECTIONS:
+                with st.expander(title):
+                    st.markdown(body)
     
     def render_url_input(self):
         """Render URL input section with validation"""
@@ -294,20 +654,15 @@ class MultiAgentUI:
         if validate_btn and repo_url:
             try:
                 validated_url = validate_github_url(repo_url)
-                st.markdown(f"""
-                <div class="status-box status-success">
-                ✅ <strong>Valid Repository URL</strong><br>
-                Repository: {validated_url}
-                </div>
-                """, unsafe_allow_html=True)
+                st.markdown(_URL_VALID_TEMPLATE.format_map({"url": html.escape(validated_url)}),
+                           unsafe_allow_html=True)
                 st.session_state.last_repo_url = repo_url
+                # Remember the result so start_pipeline doesn't validate the same input again
+                st.session_state.validated_for = repo_url
+                st.session_state.validated_url = validated_url
             except (ValidationError, SecurityViolationError) as e:
-                st.markdown(f"""
-                <div class="status-box status-error">
-                ❌ <strong>Invalid URL</strong><br>
-                {str(e)}
-                </div>
-                """, unsafe_allow_html=True)
+                st.markdown(_URL_INVALID_TEMPLATE.format_map({"error": html.escape(str(e))}),
+                           unsafe_allow_html=True)
         
         return repo_url
     
@@ -321,7 +676,8 @@ class MultiAgentUI:
         with col1:
             start_pipeline = st.button(
                 "🚀 Start Pipeline",
-                disabled=not repo_url or st.session_state.pipeline_status == "running",
+                disabled=(not repo_url or st.session_state.pipeline_status == "running"
+                          or st.session_state.pdf_future is not None),
                 use_container_width=True,
                 help="Begin the analysis and generation process"
             )
@@ -329,7 +685,8 @@ class MultiAgentUI:
         with col2:
             reset_pipeline = st.button(
                 "🔄 Reset",
-                disabled=st.session_state.pipeline_status == "running",
+                disabled=(st.session_state.pipeline_status == "running"
+                          or st.session_state.pdf_future is not None),
                 use_container_width=True,
                 help="Reset the current session"
             )
@@ -354,9 +711,14 @@ class MultiAgentUI:
     
     def start_pipeline(self, repo_url: str):
         """Start the publication generation pipeline"""
+        from agents.nodes import create_mcp_message
+        
         try:
-            # Validate URL again before processing
-            validated_url = validate_github_url(repo_url)
+            # Reuse the sidebar validation when it was for this exact input
+            if st.session_state.validated_url and st.session_state.validated_for == repo_url:
+                validated_url = st.session_state.validated_url
+            else:
+                validated_url = validate_github_url(repo_url)
             
             # Update session state
             st.session_state.pipeline_status = "running"
@@ -367,7 +729,10 @@ class MultiAgentUI:
             msg = create_mcp_message(
                 role="agent", 
                 name="RepoNode", 
-                content={"repo_url": validated_url}
+                content={"repo_url": validated_url,
+                         "variants": st.session_state.get("num_variants", 1),
+                         "writer_model": st.session_state.get("writer_model"),
+                         "evaluator_model": st.session_state.get("evaluator_model")}
             )
             
             st.session_state.conversation_id = msg["metadata"]["conversation_id"]
@@ -382,37 +747,35 @@ class MultiAgentUI:
             # Send message and process
             with st.spinner("🤖 Cloning repository and starting analysis..."):
                 try:
-                    self.coordinator.send(msg)
-                    self.coordinator.run_once()
-                    self.coordinator.run_once()
+                    asyncio.run(self._drive_pipeline(msg))
                 except Exception as e:
                     raise Exception(f"Coordinator execution error: {str(e)}")
             
             # Check for draft completion
             try:
-                events = self.coordinator.get_conversation_events(st.session_state.conversation_id)
+                event_index = self._get_event_index(st.session_state.conversation_id)
+                events = event_index.events
                 
                 # Debug: log events structure
-                if events:
+                if events and system_logger.logger.isEnabledFor(logging.DEBUG):
                     system_logger.logger.debug("pipeline_events", extra={
                         "event_type": "debug",
                         "events_count": len(events),
-                        "events_sample": str(events[:2]) if len(events) > 0 else "none"
+                        "events_sample": _json_dumps(events[:2])
                     })
                 
-                draft_event = None
-                for event in events:
-                    if isinstance(event, dict) and event.get("content", {}).get("status") == "draft_ready":
-                        draft_event = event
-                        break
+                draft_event = event_index.draft
             except Exception as e:
                 raise Exception(f"Event processing error: {str(e)} - Events type: {type(events) if 'events' in locals() else 'undefined'}")
             
             if draft_event:
                 st.session_state.md_path = draft_event["content"]["md_path"]
+                st.session_state.draft_variants = draft_event["content"].get("variant_paths", [])
                 st.session_state.pipeline_status = "draft_ready"
                 
                 st.success("✅ Draft generated successfully! Review and edit below.")
+                if draft_event["content"].get("cached"):
+                    st.info("♻️ Draft served from cache")
                 
                 # Show generation metrics
                 processing_time = time.time() - st.session_state.processing_start_time
@@ -420,10 +783,7 @@ class MultiAgentUI:
                 
             else:
                 # Check for errors
-                error_events = []
-                for event in events:
-                    if isinstance(event, dict) and "error" in event.get("content", {}):
-                        error_events.append(event)
+                error_events = event_index.errors
                 
                 if error_events:
                     error_msg = error_events[0]["content"]["error"]
@@ -437,6 +797,11 @@ class MultiAgentUI:
         except Exception as e:
             self.handle_error("Pipeline start failed", e)
     
+    async def _drive_pipeline(self, msg: Dict[str, Any]):
+        """Send the initial message and drain the graph; sibling nodes run concurrently"""
+        self.coordinator.send(msg)
+        await self.coordinator.arun_once()
+    
     def render_status_display(self):
         """Render current pipeline status"""
         if st.session_state.pipeline_status != "idle":
@@ -444,22 +809,14 @@ class MultiAgentUI:
                        unsafe_allow_html=True)
             
             # Status indicator
-            status_colors = {
-                "running": ("🟡", "Processing...", "status-warning"),
-                "draft_ready": ("🟢", "Draft Ready", "status-success"),
-                "error": ("🔴", "Error Occurred", "status-error"),
-                "processing": ("🟠", "Processing...", "status-info"),
-                "completed": ("✅", "Completed", "status-success")
-            }
-            
-            icon, text, css_class = status_colors.get(st.session_state.pipeline_status, ("❓", "Unknown", "status-info"))
-            
-            st.markdown(f"""
-            <div class="status-box {css_class}">
-            <strong>{icon} Status: {text}</strong><br>
-            Conversation ID: {st.session_state.conversation_id or 'None'}
-            </div>
-            """, unsafe_allow_html=True)
+            icon, text, css_class = _STATUS_COLORS.get(st.session_state.pipeline_status, _UNKNOWN_STATUS)
+            
+            st.markdown(_STATUS_BOX_TEMPLATE.format_map({
+                "css_class": css_class,
+                "icon": icon,
+                "text": text,
+                "conversation_id": html.escape(st.session_state.conversation_id or 'None')
+            }), unsafe_allow_html=True)
             
             # Show execution metrics
             if st.session_state.execution_metrics:
@@ -478,20 +835,46 @@ class MultiAgentUI:
                 with col3:
                     st.metric("Pipeline Stage", st.session_state.pipeline_status.replace("_", " ").title())
     
+    @st.fragment
     def render_editor(self):
         """Render the markdown editor section"""
-        if st.session_state.md_path and os.path.exists(st.session_state.md_path):
+        if st.session_state.md_path and _path_exists(st.session_state.md_path):
             st.markdown('<h2 class="section-header">📝 Document Editor</h2>', 
                        unsafe_allow_html=True)
             
-            # Load current content
+            # Switch between alternative drafts; all variants are already on disk
+            variants = st.session_state.get("draft_variants") or []
+            if len(variants) > 1:
+                current = variants.index(st.session_state.md_path) if st.session_state.md_path in variants else 0
+                choice = st.radio(
+                    "Draft variant",
+                    range(len(variants)),
+                    index=current,
+                    format_func=lambda i: f"Draft {i + 1}",
+                    horizontal=True
+                )
+                if variants[choice] != st.session_state.md_path:
+                    # Evaluation and PDF sections depend on md_path, so rerun the whole app
+                    st.session_state.md_path = variants[choice]
+                    st.rerun()
+            
+            # Load current content; cached until the file's mtime or size changes
             try:
-                with open(st.session_state.md_path, 'r', encoding='utf-8') as f:
-                    md_text = f.read()
+                stat = os.stat(st.session_state.md_path)
+                stamp = (st.session_state.md_path, stat.st_mtime_ns, stat.st_size)
+                md_text = _load_md(*stamp)
             except Exception as e:
                 st.error(f"Error loading document: {str(e)}")
                 return
             
+            # Track the digest of what is on disk so saves only write real changes.
+            # Our own saves update md_stamp, so a mismatch means the file changed
+            # underneath the editor and the widget is reloaded from disk
+            if st.session_state.md_stamp != stamp:
+                st.session_state.md_stamp = stamp
+                st.session_state.md_sha = _md_digest(md_text)
+                st.session_state.editor_rev += 1
+            
             # Editor tabs
             tab1, tab2 = st.tabs(["📝 Edit", "👁️ Preview"])
             
@@ -501,6 +884,8 @@ class MultiAgentUI:
                     "Edit your research publication (Markdown format):",
                     value=md_text,
                     height=500,
+                    # Keyed so a save (which changes value) doesn't reset the widget
+                    key=f"md_editor:{st.session_state.md_path}:{st.session_state.editor_rev}",
                     help="Use Markdown syntax for formatting. The content will be converted to PDF."
                 )
                 
@@ -523,37 +908,82 @@ class MultiAgentUI:
                 with col3:
                     auto_save = st.checkbox("Auto-save", help="Automatically save changes")
                 
+                word_count, char_count = _text_counts(edited_text)
+                
                 with col4:
-                    word_count = len(edited_text.split())
                     st.metric("Words", word_count)
                 
                 with col5:
-                    char_count = len(edited_text)
                     st.metric("Characters", char_count)
                 
-                # Handle save
-                if save_edits or (auto_save and edited_text != md_text):
+                # Remember the buffer so PDF generation and evaluation can flush it
+                st.session_state.editor_buffer = (st.session_state.md_path, edited_text)
+                
+                # Handle save; auto-save is debounced to one write per interval,
+                # and an edit that lands inside the interval is written on the
+                # next interaction instead of being dropped
+                now = time.monotonic()
+                autosave_due = auto_save and (
+                    st.session_state.autosave_pending
+                    or now - st.session_state.last_autosave >= AUTOSAVE_INTERVAL
+                )
+                edited_sha = _md_digest(edited_text)
+                if edited_sha == st.session_state.md_sha:
+                    st.session_state.autosave_pending = False
+                    if save_edits:
+                        st.info("No changes to save")
+                elif save_edits or autosave_due:
                     try:
-                        with open(st.session_state.md_path, 'w', encoding='utf-8') as f:
-                            f.write(edited_text)
+                        self._write_document(edited_text, edited_sha)
+                        if autosave_due:
+                            st.session_state.last_autosave = now
                         st.success("✅ Document saved successfully!")
-                        
-                        # Log the edit
-                        system_logger.logger.info("document_edited", extra={
-                            "event_type": "document_edited",
-                            "conversation_id": st.session_state.conversation_id,
-                            "word_count": word_count,
-                            "char_count": char_count
-                        })
-                        
                     except Exception as e:
                         st.error(f"❌ Error saving document: {str(e)}")
+                elif auto_save:
+                    st.session_state.autosave_pending = True
             
             with tab2:
-                # Preview the markdown
+                # Preview the markdown; HTML is cached per content so reruns skip the parse
                 st.markdown("### Preview:")
-                st.markdown(edited_text)
+                st.html(_render_preview_html(edited_text))
     
+    def _write_document(self, text: str, sha: bytes):
+        """Write the editor text to md_path and record what is now on disk"""
+        with open(st.session_state.md_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        stat = os.stat(st.session_state.md_path)
+        st.session_state.md_stamp = (st.session_state.md_path, stat.st_mtime_ns, stat.st_size)
+        st.session_state.md_sha = sha
+        st.session_state.autosave_pending = False
+        
+        # Log the edit
+        word_count, char_count = _text_counts(text)
+        system_logger.logger.info("document_edited", extra={
+            "event_type": "document_edited",
+            "conversation_id": st.session_state.conversation_id,
+            "word_count": word_count,
+            "char_count": char_count
+        })
+    
+    def _flush_editor(self):
+        """Save unsaved editor text before a step that reads md_path from disk"""
+        buffer = st.session_state.get("editor_buffer")
+        if not buffer:
+            return
+        # Only flush onto the file version the editor last loaded or saved;
+        # a new draft written to the path since then wins
+        path, text = buffer
+        if path != st.session_state.md_path:
+            return
+        stat = os.stat(path)
+        if (path, stat.st_mtime_ns, stat.st_size) != st.session_state.md_stamp:
+            return
+        sha = _md_digest(text)
+        if sha != st.session_state.md_sha:
+            self._write_document(text, sha)
+    
+    @st.fragment
     def render_evaluation_section(self):
         """Render document evaluation section"""
         if st.session_state.md_path:
@@ -566,13 +996,14 @@ class MultiAgentUI:
                 run_evaluation = st.button(
                     "🧮 Analyze Quality",
                     use_container_width=True,
-                    help="Run readability and quality analysis"
+                    help="Run readability and quality analysis",
+                    # The PDF job renders from the file on disk; don't race it
+                    disabled=st.session_state.pdf_future is not None
                 )
             
             with col2:
-                # Manual evaluation for testing
-                if st.button("🔄 Force Refresh", use_container_width=True, help="Refresh evaluation results"):
-                    st.rerun()
+                # Clicking reruns this fragment, which re-reads the results
+                st.button("🔄 Force Refresh", use_container_width=True, help="Refresh evaluation results")
                     
             with col3:
                 if run_evaluation:
@@ -584,6 +1015,8 @@ class MultiAgentUI:
     
     def run_evaluation(self):
         """Run document evaluation"""
+        from agents.nodes import create_mcp_message
+        
         try:
             st.info("🔍 Starting quality analysis...")
             
@@ -591,6 +1024,7 @@ class MultiAgentUI:
             if not st.session_state.md_path or not os.path.exists(st.session_state.md_path):
                 st.error("❌ No document file found to analyze!")
                 return
+            self._flush_editor()
                 
             # Use existing conversation_id if available, otherwise create new one
             if not st.session_state.conversation_id:
@@ -621,15 +1055,18 @@ class MultiAgentUI:
             st.info("✅ Coordinator processing complete")
             
             # Check if evaluation completed immediately
-            events = self.coordinator.get_conversation_events(st.session_state.conversation_id)
+            event_index = self._get_event_index(st.session_state.conversation_id)
+            events = event_index.events
             st.info(f"📊 Found {len(events)} total events in conversation")
             
-            eval_events = [e for e in events if isinstance(e, dict) and e.get("content", {}).get("status") == "eval_done"]
+            eval_events = event_index.evals
             
             if eval_events:
                 st.success(f"✅ Quality analysis completed! Found {len(eval_events)} results.")
                 # Show a sample of the results
                 latest_eval = eval_events[-1]["content"]
+                if latest_eval.get("cached"):
+                    st.info("♻️ Metrics served from cache")
                 st.write(f"📈 Readability Score: {latest_eval.get('flesch_reading_ease', 'N/A')}")
                 st.write(f"📝 Word Count: {latest_eval.get('word_count', 'N/A')}")
             else:
@@ -637,13 +1074,11 @@ class MultiAgentUI:
                 st.info("💡 Try clicking 'Analyze Quality' again if results don't appear.")
                 # Show debug info about what events we got
                 st.write("🔍 Debug - Event types found:")
-                for i, event in enumerate(events):
-                    status = event.get("content", {}).get("status", "no status")
-                    name = event.get("name", "no name")
-                    st.write(f"  {i+1}: {name} - {status}")
-            
-            # Don't force rerun here to prevent conversation reset
-            # st.rerun()
+                st.markdown("  \n".join(
+                    f"{i}: {event.get('name', 'no name')} - "
+                    f"{event.get('content', {}).get('status', 'no status')}"
+                    for i, event in enumerate(events, 1)
+                ))
             
         except Exception as e:
             self.handle_error("Evaluation failed", e)
@@ -655,30 +1090,16 @@ class MultiAgentUI:
             st.error("⚠️ Coordinator not initialized. Please refresh the page.")
             return
             
-        # Get all events for debugging
-        all_events = self.coordinator.get_conversation_events()
-        eval_events_all = []
-        for event in all_events:
-            if isinstance(event, dict) and event.get("content", {}).get("status") == "eval_done":
-                eval_events_all.append(event)
-        
-        # Also get conversation-specific events if we have a conversation_id
+        # Only this conversation's events; nothing from other sessions or runs
         conversation_events = []
-        eval_events_conv = []
+        eval_events = []
         if st.session_state.conversation_id:
-            conversation_events = self.coordinator.get_conversation_events(st.session_state.conversation_id)
-            for event in conversation_events:
-                if isinstance(event, dict) and event.get("content", {}).get("status") == "eval_done":
-                    eval_events_conv.append(event)
-        
-        # Use the most recent eval events from either source
-        eval_events = eval_events_conv if eval_events_conv else eval_events_all
-            
+            conv_index = self._get_event_index(st.session_state.conversation_id)
+            conversation_events, eval_events = conv_index.events, conv_index.evals
         
         # Always show basic status
         st.write(f"🔗 **Conversation:** {st.session_state.conversation_id[:8] if st.session_state.conversation_id else 'None'}...")
         st.write(f"📊 **Events in conversation:** {len(conversation_events)}")
-        st.write(f"📋 **All eval events found:** {len(eval_events_all)}")
         st.write(f"✅ **Evaluation results for this session:** {len(eval_events)}")
         
         # Show recent evaluation data if available
@@ -697,11 +1118,11 @@ class MultiAgentUI:
             if st.checkbox("📋 Show All Events", key="show_all_events"):
                 for i, event in enumerate(conversation_events):
                     st.write(f"**Event {i+1}:**")
-                    st.json(event)
+                    st.code(_json_dumps(event), language="json")
             
             if eval_events:
                 st.write("**Latest eval event content:**")
-                st.json(eval_events[-1]["content"])
+                st.code(_json_dumps(eval_events[-1]["content"]), language="json")
         
         # Display metrics (moved outside debug section)
         if eval_events:
@@ -740,43 +1161,13 @@ class MultiAgentUI:
                 else:
                     st.metric("Avg Sentence Length", "N/A")
             
-            # Show additional metrics if available
-            if latest_eval.get('flesch_kincaid_grade'):
-                st.info(f"📚 Reading Grade Level: {latest_eval['flesch_kincaid_grade']:.1f}")
-        elif eval_events_all:
-            st.warning(f"⚠️ Found {len(eval_events_all)} evaluation(s) but not for current session. Showing latest:")
-            latest_eval = eval_events_all[-1]["content"]
-            
-            # Display metrics in a prominent way
-            st.markdown("### 📈 Quality Metrics (Latest Available)")
-            
-            col1, col2, col3, col4 = st.columns(4)
-            
-            with col1:
-                if "flesch_reading_ease" in latest_eval and latest_eval["flesch_reading_ease"] is not None:
-                    score = latest_eval["flesch_reading_ease"]
-                    st.metric("Readability Score", f"{score:.1f}", 
-                            help="Flesch Reading Ease (higher = easier to read)")
-            
-            with col2:
-                if "word_count" in latest_eval:
-                    st.metric("Word Count", latest_eval["word_count"])
-            
-            with col3:
-                if "sentence_count" in latest_eval:
-                    st.metric("Sentences", latest_eval["sentence_count"])
-            
-            with col4:
-                if "avg_sentence_length" in latest_eval:
-                    avg_len = latest_eval["avg_sentence_length"]
-                    st.metric("Avg Sentence Length", f"{avg_len:.1f}")
-            
             # Show additional metrics if available
             if latest_eval.get('flesch_kincaid_grade'):
                 st.info(f"📚 Reading Grade Level: {latest_eval['flesch_kincaid_grade']:.1f}")
         else:
             st.info("🔍 No evaluation results found. Click 'Analyze Quality' to run analysis.")
     
+    @st.fragment
     def render_pdf_generation(self):
         """Render PDF generation section"""
         if st.session_state.md_path:
@@ -789,62 +1180,72 @@ class MultiAgentUI:
                 generate_pdf = st.button(
                     "📄 Generate PDF",
                     use_container_width=True,
-                    help="Convert the document to PDF format"
+                    help="Convert the document to PDF format",
+                    disabled=st.session_state.pdf_future is not None
                 )
             
             with col2:
                 if generate_pdf:
-                    with st.spinner("Generating PDF..."):
-                        self.generate_pdf()
+                    self.generate_pdf()
+                
+                # Only the status fragment reruns while the background job is pending
+                if st.session_state.pdf_future is not None:
+                    st.fragment(run_every=PDF_POLL_INTERVAL)(self._poll_pdf_job)()
             
             # PDF download
-            if st.session_state.pdf_path and os.path.exists(st.session_state.pdf_path):
+            if st.session_state.pdf_path and _path_exists(st.session_state.pdf_path):
                 st.success("✅ PDF generated successfully!")
                 
                 try:
-                    with open(st.session_state.pdf_path, "rb") as f:
-                        pdf_bytes = f.read()
-                    
+                    # Streamlit calls data only when the button is clicked, so
+                    # reruns don't read the PDF into memory
+                    pdf_path = st.session_state.pdf_path
                     st.download_button(
                         label="⬇️ Download PDF",
-                        data=pdf_bytes,
-                        file_name=os.path.basename(st.session_state.pdf_path),
+                        data=functools.partial(_read_bytes, pdf_path),
+                        file_name=os.path.basename(pdf_path),
                         mime="application/pdf",
                         use_container_width=False
                     )
                     
                     # Show PDF info
-                    file_size = len(pdf_bytes) / 1024  # KB
+                    file_size = os.path.getsize(pdf_path) / 1024  # KB
                     st.info(f"📊 PDF Size: {file_size:.1f} KB")
                     
                 except Exception as e:
                     st.error(f"Error reading PDF file: {str(e)}")
     
     def generate_pdf(self):
-        """Generate PDF from markdown"""
+        """Start PDF generation in the background; _poll_pdf_job picks up the result"""
         try:
-            pdf_msg = create_mcp_message(
-                role="agent",
-                name="PDFNode",
-                content={"md_path": st.session_state.md_path},
-                conversation_id=st.session_state.conversation_id
+            self._flush_editor()
+            st.session_state.pdf_future = _background_executor().submit(
+                _run_pdf_job, st.session_state.md_path, st.session_state.conversation_id
             )
-            
-            self.coordinator.send(pdf_msg)
-            self.coordinator.run_once()
-            
-            # Check for PDF completion
-            events = self.coordinator.get_conversation_events(st.session_state.conversation_id)
-            
-            pdf_event = None
-            for event in events:
-                if isinstance(event, dict) and event.get("content", {}).get("status") == "pdf_ready":
-                    pdf_event = event
-                    break
-            
-            if pdf_event:
-                st.session_state.pdf_path = pdf_event["content"]["pdf_path"]
-            
+        except Exception as e:
+            self.handle_error("PDF generation failed", e)
+            return
+        # Rerun the whole page so actions outside this fragment are disabled too
+        st.rerun()
+    
+    def _poll_pdf_job(self):
+        """Show progress until the PDF job finishes, then refresh the page once"""
+        future = st.session_state.pdf_future
+        if future is None:
+            return
+        if not future.done():
+            st.info("⏳ Generating PDF...")
+            return
+        self._collect_pdf(future)
+        st.rerun()
+    
+    def _collect_pdf(self, future):
+        """Store the finished job's PDF path (or report its error)"""
+        st.session_state.pdf_future = None
+        try:
+            pdf_path = future.result()
+            if pdf_path:
+                st.session_state.pdf_path = pdf_path
         except Exception as e:
             self.handle_error("PDF generation failed", e)
     
@@ -855,13 +1256,11 @@ class MultiAgentUI:
                        unsafe_allow_html=True)
             
             with st.expander("View Error Details", expanded=len(st.session_state.error_log) < 3):
-                for i, error in enumerate(st.session_state.error_log, 1):
-                    st.markdown(f"""
-                    <div class="status-box status-error">
-                    <strong>Error {i}:</strong><br>
-                    {error}
-                    </div>
-                    """, unsafe_allow_html=True)
+                # One element for the whole log instead of one per entry
+                st.markdown("".join(
+                    _ERROR_ENTRY_TEMPLATE.format(index=i, error=html.escape(str(error)))
+                    for i, error in enumerate(st.session_state.error_log, 1)
+                ), unsafe_allow_html=True)
     
     def handle_error(self, context: str, error: Exception):
         """Handle and log errors with user-friendly messages"""
@@ -869,39 +1268,8 @@ class MultiAgentUI:
         user_friendly_msg = error_msg
         
         # Provide user-friendly messages for common errors
-        if "Repository error" in error_msg and "could not read Username" in error_msg:
-            user_friendly_msg = (
-                "🔒 Repository Access Error\n\n"
-                "This repository appears to be private or requires authentication. "
-                "Please ensure:\n"
-                "• The repository is public\n"
-                "• The URL is correct\n"
-                "• The repository exists\n\n"
-                "Only public GitHub repositories are currently supported."
-            )
-        elif "Repository not found" in error_msg:
-            user_friendly_msg = (
-                "🔍 Repository Not Found\n\n"
-                "The repository could not be found. Please check:\n"
-                "• The URL is spelled correctly\n"
-                "• The repository exists\n"
-                "• You have access to view it"
-            )
-        elif "Repository appears to be private" in error_msg:
-            user_friendly_msg = (
-                "🔒 Private Repository Detected\n\n"
-                "This repository is private and cannot be processed. "
-                "Please use a public repository or contact the repository owner "
-                "to make it public."
-            )
-        elif "Network" in error_msg or "timeout" in error_msg.lower():
-            user_friendly_msg = (
-                "🌐 Network Connection Error\n\n"
-                "Unable to connect to GitHub. Please check:\n"
-                "• Your internet connection\n"
-                "• GitHub's status (status.github.com)\n"
-                "• Try again in a few minutes"
-            )
+        tag = _classify(error_msg)
+        user_friendly_msg = _ERROR_TEMPLATES.get(tag, error_msg)
         
         # Store both technical and user-friendly messages
         technical_msg = f"{context}: {error_msg}"
@@ -924,11 +1292,11 @@ class MultiAgentUI:
     
     def reset_session(self):
         """Reset the current session"""
-        for key in ["conversation_id", "md_path", "pdf_path", "error_log", 
-                   "execution_metrics", "processing_start_time"]:
-            st.session_state[key] = None if key != "error_log" and key != "execution_metrics" else []
-        
-        st.session_state.pipeline_status = "idle"
+        # Fresh copies so containers are never shared between resets
+        st.session_state.update({
+            key: value.copy() if isinstance(value, (list, dict)) else value
+            for key, value in _RESET_DEFAULTS.items()
+        })
         st.success("✅ Session reset successfully!")
         st.rerun()
     
@@ -963,12 +1331,7 @@ class MultiAgentUI:
             self.render_pdf_generation()
             self.render_error_log()
             
-            # Footer
-            st.markdown("---")
-            st.markdown(
-                "Built with ❤️ using Streamlit, LangGraph, and Groq LLMs | "
-                "🔒 Production-ready with security, monitoring, and resilience features"
-            )
+            st.markdown(_FOOTER_MD)
             
         except Exception as e:
             self.handle_error("UI rendering failed", e)
@@ -0,0 +1,22 @@
+# cython: language_level=3
+"""utils/_log_fast.pyx
+
+Optional compiled version of the JsonFormatter record filter. It walks the
+record dict with PyDict_Next instead of building a Python-level items()
+iterator. Build in place with ``cythonize -i utils/_log_fast.pyx``; when the
+extension is absent, utils/logging_config.py uses its pure-Python fallback.
+"""
+from cpython.dict cimport PyDict_Next
+from cpython.object cimport PyObject
+
+
+cpdef dict filter_record(dict d, frozenset skip):
+    """Return the items of d whose keys are not in skip, preserving order"""
+    cdef Py_ssize_t pos = 0
+    cdef PyObject* key
+    cdef PyObject* value
+    cdef dict out = {}
+    while PyDict_Next(d, &pos, &key, &value):
+        if <object>key not in skip:
+            out[<object>key] = <object>value
+    return out
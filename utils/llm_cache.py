@@ -0,0 +1,105 @@
+"""utils/llm_cache.py
+
+Exact-match cache for LLM drafts and evaluator results, so re-running the
+pipeline on the same repository (or re-evaluating an unchanged document)
+skips the expensive round trip.
+
+Uses ``diskcache`` when it is installed so entries survive restarts and are
+shared between Streamlit worker processes; otherwise falls back to a
+thread-safe in-process cache with the same interface.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+try:
+    import diskcache
+except ImportError:  # optional dependency
+    diskcache = None
+
+# Drafts are reused for a day; readability metrics are pure functions of text
+DRAFT_CACHE_TTL = 86400
+EVAL_CACHE_TTL = 7 * 86400
+
+_MISSING = object()
+
+
+class _MemoryCache:
+    """Minimal in-process stand-in for diskcache.Cache (get/set with expiry)"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._data: Dict[str, Tuple[Optional[float], Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            return value
+
+    def set(self, key: str, value: Any, expire: Optional[float] = None) -> bool:
+        with self._lock:
+            if len(self._data) >= self.max_entries and key not in self._data:
+                # Dicts keep insertion order, so this evicts the oldest entry
+                self._data.pop(next(iter(self._data)))
+            expires_at = time.monotonic() + expire if expire else None
+            self._data[key] = (expires_at, value)
+        return True
+
+    def clear(self) -> int:
+        with self._lock:
+            count = len(self._data)
+            self._data.clear()
+        return count
+
+
+def _create_cache(directory: str = ".cache/llm"):
+    if diskcache is not None:
+        return diskcache.Cache(directory)
+    return _MemoryCache()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Return the shared cache, creating it (and its directory) on first use"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = _create_cache()
+    return _cache
+
+
+def make_key(*parts: Any) -> str:
+    """Build a stable cache key from JSON-serializable parts"""
+    raw = json.dumps(parts, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+def text_digest(text: str) -> str:
+    """Content hash used to key results that depend only on document text"""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def cached_call(key: str, compute: Callable[[], Any], expire: Optional[float] = None) -> Tuple[Any, bool]:
+    """Return (value, served_from_cache), computing and storing the value on a miss"""
+    cache = get_cache()
+    value = cache.get(key, _MISSING)
+    if value is not _MISSING:
+        return value, True
+    value = compute()
+    cache.set(key, value, expire=expire)
+    return value, False
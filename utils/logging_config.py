@@ -1,20 +1,119 @@
 # utils/logging_config.py
+import atexit
+import copy
 import logging
 import logging.handlers
 import os
 import json
+import queue
 from datetime import datetime
 from typing import Dict, Any, Optional
-import traceback
+
+try:
+    import orjson
+except ImportError:  # optional, faster JSON serialization for log records
+    orjson = None
+
+try:
+    from utils._log_fast import filter_record  # optional Cython build
+except ImportError:
+    def filter_record(d: Dict[str, Any], skip: frozenset) -> Dict[str, Any]:
+        """Return the items of d whose keys are not in skip, preserving order"""
+        return {k: v for k, v in d.items() if k not in skip}
+
+
+def _dumps(obj: Dict[str, Any]) -> str:
+    """Serialize a log entry to a JSON line, using orjson when it is installed"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:
+            # e.g. integers wider than 64 bits; the stdlib encoder handles them
+            pass
+    return json.dumps(obj, default=str)
+
+
+# (millisecond, formatted) for the most recent record; bursts of log events
+# within the same millisecond reuse the string instead of re-formatting
+_last_ts = (-1, "")
+
+
+def _iso_from_ms(ms: int) -> str:
+    """UTC ISO-8601 timestamp (millisecond precision) for a ms-since-epoch value"""
+    global _last_ts
+    cached_ms, cached = _last_ts
+    if ms == cached_ms:
+        return cached
+    formatted = datetime.utcfromtimestamp(ms / 1000).isoformat(timespec="milliseconds")
+    _last_ts = (ms, formatted)
+    return formatted
+
+
+class _RecordQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that hands records over with their extra= fields intact"""
+    
+    def prepare(self, record):
+        # The stock prepare() formats the record into a plain message, which
+        # would flatten what JsonFormatter needs on the listener side. Only
+        # resolve what may change or pin frames once the call returns.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = _EXC_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_EXC_FORMATTER = logging.Formatter()
+
+
+class _ConsoleFormatter(logging.Formatter):
+    """One line per record; tracebacks only go to the JSON file log"""
+    
+    def format(self, record):
+        record.message = record.getMessage()
+        if self.usesTime():
+            record.asctime = self.formatTime(record, self.datefmt)
+        return self.formatMessage(record)
+_listeners = []
+
+
+def _attach_queued(logger: logging.Logger, *handlers: logging.Handler) -> None:
+    """Route logger through a queue to a background thread that owns handlers"""
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(_RecordQueueHandler(log_queue))
+    
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    # Drain whatever is still queued before the interpreter exits
+    atexit.register(listener.stop)
+    _listeners.append(listener)
 
 
 class SecurityAuditLogger:
     """Logger for security-related events"""
     
+    _instances: Dict[str, "SecurityAuditLogger"] = {}
+    
+    def __new__(cls, log_file: str = "logs/security_audit.log"):
+        # One instance per log file, however many times it is constructed
+        instance = cls._instances.get(log_file)
+        if instance is None:
+            instance = cls._instances[log_file] = super().__new__(cls)
+        return instance
+    
     def __init__(self, log_file: str = "logs/security_audit.log"):
+        if getattr(self, "logger", None) is not None:
+            return
         self.logger = logging.getLogger("security_audit")
         self.logger.setLevel(logging.INFO)
         
+        # Handlers are attached once per process; re-imports reuse them
+        if self.logger.handlers:
+            return
+        
         # Create logs directory if it doesn't exist
         os.makedirs(os.path.dirname(log_file), exist_ok=True)
         
@@ -27,46 +126,64 @@ class SecurityAuditLogger:
         formatter = JsonFormatter()
         file_handler.setFormatter(formatter)
         
-        if not self.logger.handlers:
-            self.logger.addHandler(file_handler)
+        # File writes happen on a listener thread, not the caller's
+        _attach_queued(self.logger, file_handler)
     
     def log_validation_error(self, error: str, user_input: str, user_id: Optional[str] = None):
         """Log validation errors"""
+        if not self.logger.isEnabledFor(logging.WARNING):
+            return
         self.logger.warning("validation_error", extra={
             "event_type": "validation_error",
             "error": error,
             "user_input_preview": user_input[:100] + "..." if len(user_input) > 100 else user_input,
-            "user_id": user_id,
-            "timestamp": datetime.utcnow().isoformat()
+            "user_id": user_id
         })
     
     def log_security_violation(self, violation: str, details: Dict[str, Any], user_id: Optional[str] = None):
         """Log security violations"""
+        if not self.logger.isEnabledFor(logging.ERROR):
+            return
         self.logger.error("security_violation", extra={
             "event_type": "security_violation",
             "violation": violation,
             "details": details,
-            "user_id": user_id,
-            "timestamp": datetime.utcnow().isoformat()
+            "user_id": user_id
         })
     
     def log_rate_limit_exceeded(self, action: str, user_id: str):
         """Log rate limit violations"""
+        if not self.logger.isEnabledFor(logging.WARNING):
+            return
         self.logger.warning("rate_limit_exceeded", extra={
             "event_type": "rate_limit_exceeded", 
             "action": action,
-            "user_id": user_id,
-            "timestamp": datetime.utcnow().isoformat()
+            "user_id": user_id
         })
 
 
 class SystemLogger:
     """Logger for system operations and errors"""
     
+    _instances: Dict[str, "SystemLogger"] = {}
+    
+    def __new__(cls, log_file: str = "logs/system.log"):
+        # One instance per log file, however many times it is constructed
+        instance = cls._instances.get(log_file)
+        if instance is None:
+            instance = cls._instances[log_file] = super().__new__(cls)
+        return instance
+    
     def __init__(self, log_file: str = "logs/system.log"):
+        if getattr(self, "logger", None) is not None:
+            return
         self.logger = logging.getLogger("system")
         self.logger.setLevel(logging.INFO)
         
+        # Handlers are attached once per process; re-imports reuse them
+        if self.logger.handlers:
+            return
+        
         # Create logs directory
         os.makedirs(os.path.dirname(log_file), exist_ok=True)
         
@@ -81,100 +198,121 @@ class SystemLogger:
         
         # Formatters
         file_formatter = JsonFormatter()
-        console_formatter = logging.Formatter(
+        console_formatter = _ConsoleFormatter(
             '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
         )
         
         file_handler.setFormatter(file_formatter)
         console_handler.setFormatter(console_formatter)
         
-        if not self.logger.handlers:
-            self.logger.addHandler(file_handler)
-            self.logger.addHandler(console_handler)
+        # File writes happen on a listener thread, not the caller's; the
+        # console stays synchronous so it keeps its order with the app's prints
+        _attach_queued(self.logger, file_handler)
+        self.logger.addHandler(console_handler)
     
     def log_agent_execution(self, agent_name: str, conversation_id: str, 
                            execution_time: float, success: bool, error: Optional[str] = None):
         """Log agent execution details"""
         level = logging.INFO if success else logging.ERROR
+        if not self.logger.isEnabledFor(level):
+            return
         self.logger.log(level, "agent_execution", extra={
             "event_type": "agent_execution",
             "agent_name": agent_name,
             "conversation_id": conversation_id,
             "execution_time_ms": round(execution_time * 1000, 2),
             "success": success,
-            "error": error,
-            "timestamp": datetime.utcnow().isoformat()
+            "error": error
         })
     
     def log_llm_call(self, model: str, tokens_used: int, cost: float, 
                      response_time: float, conversation_id: str):
         """Log LLM API calls for monitoring and billing"""
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
         self.logger.info("llm_call", extra={
             "event_type": "llm_call",
             "model": model,
             "tokens_used": tokens_used,
             "estimated_cost_usd": cost,
             "response_time_ms": round(response_time * 1000, 2),
-            "conversation_id": conversation_id,
-            "timestamp": datetime.utcnow().isoformat()
+            "conversation_id": conversation_id
         })
     
     def log_external_api_call(self, service: str, endpoint: str, 
                              response_code: int, response_time: float):
         """Log external API calls"""
         level = logging.INFO if 200 <= response_code < 300 else logging.WARNING
+        if not self.logger.isEnabledFor(level):
+            return
         self.logger.log(level, "external_api_call", extra={
             "event_type": "external_api_call",
             "service": service,
             "endpoint": endpoint,
             "response_code": response_code,
-            "response_time_ms": round(response_time * 1000, 2),
-            "timestamp": datetime.utcnow().isoformat()
+            "response_time_ms": round(response_time * 1000, 2)
         })
     
     def log_error(self, error: Exception, context: Dict[str, Any]):
         """Log errors with full context"""
+        if not self.logger.isEnabledFor(logging.ERROR):
+            return
         self.logger.error("system_error", extra={
             "event_type": "system_error",
             "error_type": type(error).__name__,
             "error_message": str(error),
-            "traceback": traceback.format_exc(),
-            "context": context,
-            "timestamp": datetime.utcnow().isoformat()
-        })
+            "context": context
+        }, exc_info=error)
 
 
 class JsonFormatter(logging.Formatter):
     """JSON formatter for structured logging"""
     
+    # Standard LogRecord attributes; everything else on a record came from extra=
+    _SKIP = frozenset({
+        'name', 'msg', 'args', 'levelname', 'levelno',
+        'pathname', 'filename', 'module', 'lineno',
+        'funcName', 'created', 'msecs', 'relativeCreated',
+        'thread', 'threadName', 'processName', 'process', 'taskName',
+        'getMessage', 'exc_info', 'exc_text', 'stack_info', 'message'
+    })
+    
     def format(self, record):
         log_entry = {
-            "timestamp": datetime.utcnow().isoformat(),
+            # Derived from the record itself, only when a handler formats it
+            "timestamp": _iso_from_ms(int(record.created * 1000)),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
         }
         
-        # Add extra fields if present
-        if hasattr(record, 'event_type'):
-            for key, value in record.__dict__.items():
-                if key not in ['name', 'msg', 'args', 'levelname', 'levelno', 
-                              'pathname', 'filename', 'module', 'lineno', 
-                              'funcName', 'created', 'msecs', 'relativeCreated',
-                              'thread', 'threadName', 'processName', 'process',
-                              'getMessage', 'exc_info', 'exc_text', 'stack_info']:
-                    log_entry[key] = value
+        # Every structured event carries event_type; records without it (e.g.
+        # plain library messages) have no extras worth scanning __dict__ for
+        if "event_type" in record.__dict__:
+            log_entry.update(filter_record(record.__dict__, self._SKIP))
         
-        return json.dumps(log_entry, default=str)
+        # Tracebacks are only rendered for records a handler actually writes
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            log_entry["traceback"] = record.exc_text
+        
+        return _dumps(log_entry)
 
 
 # Global logger instances
 security_logger = SecurityAuditLogger()
 system_logger = SystemLogger()
 
+_logging_configured = False
+
 
 def setup_logging(log_level: str = "INFO"):
-    """Setup application-wide logging configuration"""
+    """Setup application-wide logging configuration (only the first call has effect)"""
+    global _logging_configured
+    if _logging_configured:
+        return
+    _logging_configured = True
     
     # Set root logger level
     logging.getLogger().setLevel(getattr(logging, log_level.upper()))
@@ -189,6 +327,5 @@ def setup_logging(log_level: str = "INFO"):
     
     system_logger.logger.info("logging_initialized", extra={
         "event_type": "system_startup",
-        "log_level": log_level,
-        "timestamp": datetime.utcnow().isoformat()
+        "log_level": log_level
     })
\ No newline at end of file
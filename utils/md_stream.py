@@ -0,0 +1,117 @@
+"""utils/md_stream.py
+
+Block-level markdown rendering for documents that are re-rendered many
+times while they change: a streamed draft or a document in the editor.
+
+Text is split into stable blocks (paragraphs, closed code fences, whole
+lists) and one trailing in-progress block. Each stable block's HTML is
+memoized, so re-rendering after an edit or a new chunk only re-parses what
+changed instead of the whole document.
+"""
+from __future__ import annotations
+
+import functools
+import re
+import threading
+from typing import List, Tuple
+
+import markdown
+
+_FENCE_RE = re.compile(r'^\s{0,3}(```|~~~)')
+_LIST_ITEM_RE = re.compile(r'^\s{0,3}(?:[*+-]|\d+[.)])\s')
+# Reference-link and footnote definitions apply to the whole document, so
+# text containing one cannot be rendered block by block
+_DEFINITION_RE = re.compile(r'^\s{0,3}\[[^\]]+\]:', re.MULTILINE)
+
+# Building a Markdown instance costs more than converting a typical block,
+# so each thread keeps one and resets it between conversions
+_local = threading.local()
+
+
+def _new_markdown() -> markdown.Markdown:
+    """Markdown converter that escapes raw HTML instead of passing it through"""
+    md = markdown.Markdown(extensions=['fenced_code', 'tables'])
+    md.preprocessors.deregister('html_block')
+    md.inlinePatterns.deregister('html')
+    return md
+
+
+def _convert(text: str) -> str:
+    md = getattr(_local, 'md', None)
+    if md is None:
+        md = _local.md = _new_markdown()
+    return md.reset().convert(text)
+
+
+def _continues_list(previous: str, block: str) -> bool:
+    # Loose lists are separated by blank lines; keep them in one block so
+    # numbering and nesting render the same as for the whole document
+    return bool(_LIST_ITEM_RE.match(previous)) and (
+        bool(_LIST_ITEM_RE.match(block)) or block[:1] in (' ', '\t')
+    )
+
+
+def split_blocks(text: str) -> Tuple[List[str], str]:
+    """
+    Split markdown into completed blocks and the trailing in-progress block
+
+    Args:
+        text: Markdown source, possibly still growing
+
+    Returns:
+        (stable_blocks, tail) where tail is the text after the last block
+        boundary (empty when the text ends on a boundary)
+    """
+    blocks: List[str] = []
+    current: List[str] = []
+    fence = None
+
+    for line in text.split('\n'):
+        match = _FENCE_RE.match(line)
+        if fence:
+            current.append(line)
+            if match and match.group(1) == fence:
+                blocks.append('\n'.join(current))
+                current, fence = [], None
+            continue
+        if match:
+            if current:
+                blocks.append('\n'.join(current))
+            current, fence = [line], match.group(1)
+        elif not line.strip():
+            if current:
+                blocks.append('\n'.join(current))
+                current = []
+        else:
+            current.append(line)
+
+    merged: List[str] = []
+    for block in blocks:
+        if merged and _continues_list(merged[-1], block):
+            merged[-1] = merged[-1] + '\n\n' + block
+        else:
+            merged.append(block)
+
+    tail = '\n'.join(current)
+    if tail and merged and _continues_list(merged[-1], tail):
+        tail = merged.pop() + '\n\n' + tail
+
+    return merged, tail
+
+
+@functools.lru_cache(maxsize=2048)
+def block_html(block: str) -> str:
+    """Render one stable block; identical blocks are only parsed once"""
+    return _convert(block)
+
+
+def render_markdown(text: str) -> str:
+    """Render markdown to HTML, re-parsing only blocks not seen before"""
+    if _DEFINITION_RE.search(text):
+        return _convert(text)
+    stable, tail = split_blocks(text)
+    html = ''.join(block_html(block) for block in stable)
+    if tail:
+        # The tail is still changing, so it is not worth caching
+        html += _convert(tail)
+    return html
@@ -1,15 +1,27 @@
 # utils/resilience.py
 import time
 import random
+import threading
 import functools
+from concurrent.futures import Future, TimeoutError as FuturesTimeoutError
 from typing import Callable, Any, Optional, Dict, List, Union
 import logging
+import warnings
 from enum import Enum
+from fractions import Fraction
 
 from .logging_config import system_logger
 
 logger = logging.getLogger(__name__)
 
+# Elapsed-time arithmetic uses the monotonic clock (immune to wall-clock jumps)
+_now = time.monotonic
+_now_ns = time.monotonic_ns
+
+# Jitter draws from a private generator bound once, so it neither consumes
+# nor depends on the global random state that callers may seed
+_jitter_random = random.Random().random
+
 
 class RetryStrategy(Enum):
     """Retry strategy options"""
@@ -57,15 +69,21 @@ def retry_with_backoff(
         timeout: Optional timeout in seconds for the entire operation
     """
     
+    # The un-jittered delay for each attempt is fixed by the parameters
+    delays = tuple(
+        _calculate_delay(strategy, attempt, base_delay, max_delay, jitter=False)
+        for attempt in range(max_attempts)
+    )
+    
     def decorator(func: Callable) -> Callable:
         @functools.wraps(func)
         def wrapper(*args, **kwargs) -> Any:
-            start_time = time.time()
+            start_time = _now()
             last_exception = None
             
             for attempt in range(max_attempts):
                 # Check timeout
-                if timeout and (time.time() - start_time) > timeout:
+                if timeout and (_now() - start_time) > timeout:
                     system_logger.log_error(
                         TimeoutError(f"Operation timed out after {timeout}s"),
                         {"function": func.__name__, "attempt": attempt + 1}
@@ -82,7 +100,7 @@ def retry_with_backoff(
                             "event_type": "retry_success",
                             "function": func.__name__,
                             "attempt": attempt + 1,
-                            "total_time": time.time() - start_time
+                            "total_time": _now() - start_time
                         })
                     
                     return result
@@ -94,8 +112,10 @@ def retry_with_backoff(
                     if attempt == max_attempts - 1:
                         break
                     
-                    # Calculate delay
-                    delay = _calculate_delay(strategy, attempt, base_delay, max_delay, jitter)
+                    # Look up delay; jitter avoids a thundering herd
+                    delay = delays[attempt]
+                    if jitter:
+                        delay *= 0.5 + _jitter_random() * 0.5
                     
                     # Log retry attempt
                     system_logger.logger.warning("retry_attempt", extra={
@@ -122,7 +142,7 @@ def retry_with_backoff(
             system_logger.log_error(last_exception, {
                 "function": func.__name__,
                 "max_attempts_reached": True,
-                "total_time": time.time() - start_time
+                "total_time": _now() - start_time
             })
             
             raise last_exception
@@ -149,7 +169,7 @@ def _calculate_delay(strategy: RetryStrategy, attempt: int, base_delay: float,
     
     # Add jitter to avoid thundering herd
     if jitter:
-        delay = delay * (0.5 + random.random() * 0.5)
+        delay *= 0.5 + _jitter_random() * 0.5
     
     return delay
 
@@ -170,6 +190,8 @@ class CircuitBreaker:
         self.failure_count = 0
         self.last_failure_time = None
         self.state = CircuitBreakerState.CLOSED
+        # Guards state transitions; reads on the fast path stay unlocked
+        self._lock = threading.Lock()
     
     def __call__(self, func: Callable) -> Callable:
         @functools.wraps(func)
@@ -178,15 +200,24 @@ class CircuitBreaker:
         return wrapper
     
     def _call(self, func: Callable, *args, **kwargs) -> Any:
-        if self.state == CircuitBreakerState.OPEN:
-            if self._should_attempt_reset():
-                self.state = CircuitBreakerState.HALF_OPEN
+        # Read the state once; the closed path never takes the lock
+        if self.state is CircuitBreakerState.OPEN:
+            with self._lock:
+                # Another thread may have moved the breaker on meanwhile
+                half_open = (
+                    self.state is CircuitBreakerState.OPEN and self._should_attempt_reset()
+                )
+                if half_open:
+                    self.state = CircuitBreakerState.HALF_OPEN
+                blocked = self.state is CircuitBreakerState.OPEN
+            
+            if half_open:
                 system_logger.logger.info("circuit_breaker_half_open", extra={
                     "event_type": "circuit_breaker_state_change",
                     "function": func.__name__,
                     "state": "half_open"
                 })
-            else:
+            elif blocked:
                 raise CircuitBreakerOpenError(
                     f"Circuit breaker is open for {func.__name__}"
                 )
@@ -202,32 +233,43 @@ class CircuitBreaker:
     
     def _should_attempt_reset(self) -> bool:
         return (
-            self.last_failure_time and
-            time.time() - self.last_failure_time >= self.recovery_timeout
+            self.last_failure_time is not None and
+            _now() - self.last_failure_time >= self.recovery_timeout
         )
     
     def _on_success(self, func: Callable):
-        if self.state == CircuitBreakerState.HALF_OPEN:
-            self.state = CircuitBreakerState.CLOSED
+        # Nothing to reset on the common closed-and-healthy path
+        if not self.failure_count and self.state is CircuitBreakerState.CLOSED:
+            return
+        
+        with self._lock:
+            closed = self.state is CircuitBreakerState.HALF_OPEN
+            if closed:
+                self.state = CircuitBreakerState.CLOSED
+            self.failure_count = 0
+        
+        if closed:
             system_logger.logger.info("circuit_breaker_closed", extra={
                 "event_type": "circuit_breaker_state_change",
                 "function": func.__name__,
                 "state": "closed"
             })
-        
-        self.failure_count = 0
     
     def _on_failure(self, func: Callable, exception: Exception):
-        self.failure_count += 1
-        self.last_failure_time = time.time()
+        with self._lock:
+            self.failure_count += 1
+            self.last_failure_time = _now()
+            failure_count = self.failure_count
+            opened = failure_count >= self.failure_threshold
+            if opened:
+                self.state = CircuitBreakerState.OPEN
         
-        if self.failure_count >= self.failure_threshold:
-            self.state = CircuitBreakerState.OPEN
+        if opened:
             system_logger.logger.error("circuit_breaker_opened", extra={
                 "event_type": "circuit_breaker_state_change",
                 "function": func.__name__,
                 "state": "open",
-                "failure_count": self.failure_count,
+                "failure_count": failure_count,
                 "error": str(exception)
             })
 
@@ -235,95 +277,96 @@ class CircuitBreaker:
 class RateLimiter:
     """Token bucket rate limiter"""
     
+    # The refill rate is held as an exact fraction num/den tokens per second,
+    # and tokens as integers in units of 1/(den * 1e9) token, so that each
+    # elapsed nanosecond adds exactly num units with no rounding, however
+    # slow the rate
+    
     def __init__(self, max_tokens: int, refill_rate: float):
         self.max_tokens = max_tokens
         self.refill_rate = refill_rate  # tokens per second
-        self.tokens = max_tokens
-        self.last_refill = time.time()
+        rate = Fraction(refill_rate).limit_denominator(10 ** 9)
+        self._refill_units_per_ns = rate.numerator
+        self._units_per_token = rate.denominator * 10 ** 9
+        self._max_units = max_tokens * self._units_per_token
+        self._units = self._max_units
+        self._last_refill_ns = _now_ns()
+    
+    @property
+    def tokens(self) -> float:
+        """Tokens currently available (as of the last acquire)"""
+        return self._units / self._units_per_token
     
     def acquire(self, tokens: int = 1) -> bool:
         """Try to acquire tokens"""
-        now = time.time()
+        now = _now_ns()
         
         # Refill tokens
-        time_passed = now - self.last_refill
-        self.tokens = min(
-            self.max_tokens,
-            self.tokens + (time_passed * self.refill_rate)
-        )
-        self.last_refill = now
+        units = self._units + (now - self._last_refill_ns) * self._refill_units_per_ns
+        if units > self._max_units:
+            units = self._max_units
+        self._last_refill_ns = now
         
         # Check if we have enough tokens
-        if self.tokens >= tokens:
-            self.tokens -= tokens
+        needed = tokens * self._units_per_token
+        if units >= needed:
+            self._units = units - needed
             return True
         
+        self._units = units
         return False
 
 
 def with_timeout(timeout_seconds: float):
-    """Decorator to add timeout to functions"""
+    """
+    Decorator to add timeout to functions
+    
+    Each call runs on its own daemon thread, so this works from any thread
+    and on any platform, and the timeout measures only that call's execution
+    (concurrent callers never queue behind each other). A call that times
+    out keeps running in the background, since threads cannot be killed.
+    """
     
     def decorator(func: Callable) -> Callable:
+        
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            import signal
-            
-            def timeout_handler(signum, frame):
-                raise TimeoutError(f"Function {func.__name__} timed out after {timeout_seconds} seconds")
+            future = Future()
             
-            # Set the signal handler
-            old_handler = signal.signal(signal.SIGALRM, timeout_handler)
-            signal.alarm(int(timeout_seconds))
+            def run():
+                try:
+                    future.set_result(func(*args, **kwargs))
+                except BaseException as e:
+                    future.set_exception(e)
             
+            threading.Thread(target=run, name=f"timeout-{func.__name__}", daemon=True).start()
             try:
-                result = func(*args, **kwargs)
-                return result
-            finally:
-                # Restore the old handler
-                signal.alarm(0)
-                signal.signal(signal.SIGALRM, old_handler)
+                return future.result(timeout=timeout_seconds)
+            except FuturesTimeoutError:
+                raise TimeoutError(
+                    f"Function {func.__name__} timed out after {timeout_seconds} seconds"
+                ) from None
         
         return wrapper
     return decorator
 
 
 def limit_execution_time(max_iterations: int = 1000):
-    """Decorator to limit loop iterations and prevent infinite loops"""
+    """
+    Deprecated: returns the function unchanged
+    
+    This used to swap out the builtin range() for the whole process while the
+    decorated function ran, which slowed down every other thread and was not
+    thread-safe. Use with_timeout() to bound execution instead.
+    """
+    warnings.warn(
+        "limit_execution_time is deprecated and has no effect; use with_timeout instead",
+        DeprecationWarning,
+        stacklevel=2
+    )
     
     def decorator(func: Callable) -> Callable:
-        @functools.wraps(func)
-        def wrapper(*args, **kwargs):
-            # Store original builtins
-            original_range = __builtins__.get('range') if isinstance(__builtins__, dict) else getattr(__builtins__, 'range')
-            original_while = None  # While is a statement, not a function
-            
-            iteration_count = [0]  # Use list for mutable reference
-            
-            def limited_range(*range_args):
-                """Limited range function"""
-                for i, val in enumerate(original_range(*range_args)):
-                    iteration_count[0] += 1
-                    if iteration_count[0] > max_iterations:
-                        raise RuntimeError(f"Maximum iterations ({max_iterations}) exceeded in {func.__name__}")
-                    yield val
-            
-            # Replace range temporarily
-            if isinstance(__builtins__, dict):
-                __builtins__['range'] = limited_range
-            else:
-                setattr(__builtins__, 'range', limited_range)
-            
-            try:
-                return func(*args, **kwargs)
-            finally:
-                # Restore original range
-                if isinstance(__builtins__, dict):
-                    __builtins__['range'] = original_range
-                else:
-                    setattr(__builtins__, 'range', original_range)
-        
-        return wrapper
+        return func
     return decorator
 
 
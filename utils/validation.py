@@ -1,30 +1,84 @@
 # utils/validation.py
+import asyncio
+import functools
 import re
 import os
-import urllib.parse
-from typing import Optional, Dict, Any, List
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, FrozenSet, Iterable, List, Tuple
 import logging
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import re2
+except ImportError:  # optional, linear-time (DFA) regex engine for user input
+    re2 = None
 
 logger = logging.getLogger(__name__)
 
+# Patterns are compiled once at import rather than looked up in re's cache per call
+# One alternation, so a URL is scanned once rather than once per pattern
+_SUSPICIOUS_URL_RE = re.compile(
+    r'\.\./'          # Directory traversal
+    r'|<script'       # XSS
+    r'|javascript:'   # JavaScript injection
+    r'|[;&|`$]',      # Command injection characters
+    re.IGNORECASE
+)
+_ALLOWED_NETLOCS = frozenset({'github.com', 'www.github.com'})
+_ALLOWED_ROLES = frozenset({'agent', 'user', 'system'})
+_REQUIRED_FIELDS = frozenset({'type', 'role', 'name', 'content', 'metadata'})
+_REQUIRED_METADATA = frozenset({'timestamp', 'conversation_id'})
+# Content keys holding output paths, and the extensions accepted for them
+_MD_PATH_KEYS = frozenset({'md_path', 'pdf_path'})
+_MD_PDF_EXTS = ('.md', '.pdf')
+# Single characters are a set-membership test, no regex needed
+_BAD_PATH_CHARS = frozenset(';&|`$<>')
+# Every dangerous construct contains '<', ':' or '=', so input without any of
+# them can skip the scan entirely
+_DANGEROUS_TRIGGERS = ('<', ':', '=')
+# Script tags, iframes, objects and embeds: (opening tag, closing tag)
+_BLOCKED_ELEMENT_RES = tuple(
+    (re.compile('<' + tag, re.IGNORECASE), re.compile('</' + tag + '>', re.IGNORECASE))
+    for tag in ('script', 'iframe', 'object', 'embed')
+)
+_JS_URL_RE = re.compile('javascript:', re.IGNORECASE)  # JavaScript URLs
+# Event handlers (on\w+\s*=). The lookahead captures a whole word and the
+# backreference consumes it, so a word is never re-scanned by backtracking
+_WORD_ASSIGN_RE = re.compile(r'\b(?=(\w+))\1\s*=')
+_ON_PREFIX_RE = re.compile(r'on(?=\w)', re.IGNORECASE)
+# RE2 cannot backtrack, so with it installed the plain pattern is safe to use
+# (RE2's \w is ASCII-only, hence the explicit Unicode classes)
+_RE2_EVENT_HANDLER_RE = None
+if re2 is not None:
+    try:
+        _RE2_EVENT_HANDLER_RE = re2.compile(r'(?i)on[\pL\pN_]+\s*=')
+    except Exception as e:
+        logger.warning(f"re2 unusable, falling back to re for event handlers: {e}")
+
 
 class ValidationError(Exception):
     """Custom exception for validation errors"""
-    pass
+    __slots__ = ()
 
 
 class SecurityViolationError(Exception):
     """Custom exception for security violations"""
-    pass
+    __slots__ = ()
 
 
-def validate_github_url(url: str) -> str:
+def validate_github_url(url: str, check_accessible: bool = True) -> str:
     """
     Validate and sanitize GitHub repository URL
     
     Args:
         url: GitHub repository URL to validate
+        check_accessible: Also probe the GitHub API (a network round trip);
+            the result is only logged and never fails validation
         
     Returns:
         Sanitized URL
@@ -36,120 +90,249 @@ def validate_github_url(url: str) -> str:
     if not url or not isinstance(url, str):
         raise ValidationError("Repository URL must be a non-empty string")
     
+    url, owner, repo = _validate_github_url_cached(url)
+    
+    if check_accessible:
+        _check_accessibility(url, owner, repo)
+    
+    # Return sanitized URL
+    return url
+
+
+@functools.lru_cache(maxsize=4096)
+def _validate_github_url_cached(url: str) -> Tuple[str, str, str]:
+    """
+    Format and security checks for a GitHub URL, memoized per URL string
+    
+    Only successful results are cached; a rejected URL raises again on every
+    call. The accessibility probe is not part of this and keeps its own TTL.
+    
+    Returns:
+        (sanitized URL, owner, repo)
+    """
     url = url.strip()
     
-    # Basic URL format validation
-    try:
-        parsed = urllib.parse.urlparse(url)
-    except Exception as e:
-        raise ValidationError(f"Invalid URL format: {e}")
+    scheme, host, path_parts = _split_github_url(url)
     
     # Must be HTTPS for security
-    if parsed.scheme != 'https':
+    if scheme != 'https':
         raise SecurityViolationError("Only HTTPS URLs are allowed for security")
     
     # Must be GitHub
-    if parsed.netloc not in ['github.com', 'www.github.com']:
+    if host not in _ALLOWED_NETLOCS:
         raise SecurityViolationError("Only GitHub repositories are allowed")
     
     # Basic path validation (should be /owner/repo or /owner/repo.git)
-    path_parts = [p for p in parsed.path.split('/') if p]
     if len(path_parts) < 2:
         raise ValidationError("Invalid GitHub repository path. Expected format: https://github.com/owner/repo")
     
     # Check for suspicious patterns
-    suspicious_patterns = [
-        r'\.\./',  # Directory traversal
-        r'<script',  # XSS
-        r'javascript:',  # JavaScript injection
-        r'[;&|`$]',  # Command injection characters
-    ]
+    match = _SUSPICIOUS_URL_RE.search(url)
+    if match:
+        raise SecurityViolationError(f"URL contains suspicious pattern: {match.group(0)!r}")
     
-    for pattern in suspicious_patterns:
-        if re.search(pattern, url, re.IGNORECASE):
-            raise SecurityViolationError(f"URL contains suspicious pattern: {pattern}")
+    return url, path_parts[0], path_parts[1]
+
+
+validate_github_url.cache_clear = _validate_github_url_cached.cache_clear
+
+
+def _split_github_url(url: str) -> Tuple[str, str, List[str]]:
+    """
+    Split a URL into its parts for validation, without urlparse's generality
     
+    Args:
+        url: URL to split
+        
+    Returns:
+        (lower-cased scheme, host, non-empty path segments); the query and
+        fragment are dropped
+    """
+    scheme, sep, rest = url.partition('://')
+    if not sep:
+        scheme, rest = '', url
+    rest = rest.split('#', 1)[0].split('?', 1)[0]
+    host, _, path = rest.partition('/')
+    return scheme.lower(), host, [p for p in path.split('/') if p]
+
+
+async def validate_github_url_async(url: str) -> str:
+    """
+    Validate a GitHub repository URL without blocking the event loop
+    
+    The format and security checks run inline; the accessibility probe runs
+    on a worker thread, so several URLs can be probed concurrently with
+    asyncio.gather().
+    
+    Args:
+        url: GitHub repository URL to validate
+        
+    Returns:
+        Sanitized URL
+        
+    Raises:
+        ValidationError: If URL is invalid
+        SecurityViolationError: If URL contains security violations
+    """
+    if not url or not isinstance(url, str):
+        raise ValidationError("Repository URL must be a non-empty string")
+    
+    url, owner, repo = _validate_github_url_cached(url)
+    await asyncio.to_thread(_check_accessibility, url, owner, repo)
+    return url
+
+
+def _check_accessibility(url: str, owner: str, repo: str) -> None:
+    """Probe repository accessibility, logging (never raising) on failure"""
     # Check if repository is publicly accessible (but allow to proceed if check fails)
     try:
-        if not _is_github_repo_accessible(url):
+        if not _is_github_repo_accessible(url, owner, repo):
             logger.warning(f"Could not verify repository accessibility: {url}")
             # Don't fail validation - proceed with a warning instead
             # This allows the system to work even with network issues
     except Exception as e:
         logger.warning(f"Repository accessibility check failed due to network error: {e}")
         # Continue anyway - network issues shouldn't block valid URLs
-    
-    # Return sanitized URL
-    return url
 
 
-def _is_github_repo_accessible(url: str) -> bool:
+# One pooled session for GitHub API probes, so repeat checks reuse the TLS connection
+_GH_SESSION = requests.Session()
+_GH_SESSION.headers.update({
+    'User-Agent': 'Gen-Authering/1.0',
+    'Accept': 'application/vnd.github.v3+json'
+})
+_GH_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[502, 503, 504])
+))
+
+# Accessibility probes are cached per (owner, repo): {key: (expires_at, result, etag)}
+_ACCESS_CACHE_TTL = 300.0
+_ACCESS_CACHE_MAX = 1024
+_access_cache: Dict[Tuple[str, str], Tuple[float, bool, Optional[str]]] = {}
+_access_cache_lock = threading.Lock()
+# Monotonic time before which the GitHub API should not be called, either
+# because it told us so or because it was unreachable
+_api_backoff_until = 0.0
+_NETWORK_BACKOFF = 30.0
+
+
+def _remember_access(key: Tuple[str, str], result: bool, etag: Optional[str]) -> None:
+    with _access_cache_lock:
+        if key not in _access_cache and len(_access_cache) >= _ACCESS_CACHE_MAX:
+            # Evict the oldest entry (dicts keep insertion order)
+            del _access_cache[next(iter(_access_cache))]
+        _access_cache[key] = (time.monotonic() + _ACCESS_CACHE_TTL, result, etag)
+
+
+def _note_rate_limit(response: requests.Response) -> None:
+    """Back off until GitHub's rate-limit window resets, if the response says so"""
+    global _api_backoff_until
+    wait = None
+    retry_after = response.headers.get('Retry-After')
+    if retry_after and retry_after.isdigit():
+        wait = float(retry_after)
+    elif response.headers.get('X-RateLimit-Remaining') == '0':
+        reset = response.headers.get('X-RateLimit-Reset', '')
+        if reset.isdigit():
+            wait = max(0.0, int(reset) - time.time())
+    if wait is not None:
+        _api_backoff_until = time.monotonic() + wait
+
+
+def _is_github_repo_accessible(url: str, owner: str, repo: str) -> bool:
     """
     Check if a GitHub repository is publicly accessible
     
+    Results are cached for a few minutes per repository. Expired entries are
+    revalidated with their ETag, and the GitHub API is not called at all while
+    its rate limit is exhausted.
+    
     Args:
-        url: GitHub repository URL
+        url: GitHub repository URL (for log messages)
+        owner: Repository owner from the URL path
+        repo: Repository name from the URL path
         
     Returns:
         True if repository is accessible, False if not accessible or check failed
     """
+    global _api_backoff_until
     try:
-        # Convert github.com URL to API URL for checking
-        parsed = urllib.parse.urlparse(url)
-        path_parts = [p for p in parsed.path.split('/') if p]
+        # Remove .git suffix if present (rstrip('.git') would also eat
+        # trailing '.', 'g', 'i' and 't' characters of the name itself)
+        repo = repo.removesuffix('.git')
+        
+        key = (owner.lower(), repo.lower())
+        now = time.monotonic()
+        cached = _access_cache.get(key)
+        if cached and cached[0] > now:
+            return cached[1]
         
-        if len(path_parts) >= 2:
-            owner, repo = path_parts[0], path_parts[1]
-            # Remove .git suffix if present
-            repo = repo.rstrip('.git')
-            
-            # Use GitHub API to check if repo exists and is public
-            api_url = f"https://api.github.com/repos/{owner}/{repo}"
-            
-            # Add headers to identify our request
-            headers = {
-                'User-Agent': 'Gen-Authering/1.0',
-                'Accept': 'application/vnd.github.v3+json'
-            }
-            
-            response = requests.get(api_url, timeout=10, headers=headers)
-            
-            if response.status_code == 200:
-                repo_data = response.json()
-                # Check if repository is public (not private)
-                is_public = not repo_data.get('private', True)
-                logger.info(f"Repository {owner}/{repo} accessibility check: {'public' if is_public else 'private'}")
-                return is_public
-            elif response.status_code == 404:
-                logger.warning(f"Repository not found or private: {url}")
-                return False
-            elif response.status_code == 403:
-                logger.warning(f"GitHub API rate limited or access denied for {url}")
-                # Return True for rate limit issues - assume repo is accessible
-                return True
-            else:
-                logger.warning(f"GitHub API error {response.status_code} for {url}")
-                # For other errors, assume accessible to avoid blocking valid URLs
-                return True
-                
+        if now < _api_backoff_until:
+            logger.info(f"GitHub API backing off; skipping accessibility check for {url}")
+            # Same assumption as a rate-limited response: don't block the URL
+            return cached[1] if cached else True
+        
+        # Use GitHub API to check if repo exists and is public
+        api_url = f"https://api.github.com/repos/{owner}/{repo}"
+        
+        # The session identifies our request; only the conditional header varies
+        headers = {}
+        if cached and cached[2]:
+            # A 304 reply confirms the cached result
+            headers['If-None-Match'] = cached[2]
+        
+        # HEAD carries the status and ETag without the repository JSON
+        response = _GH_SESSION.head(api_url, timeout=(3, 10), headers=headers, allow_redirects=True)
+        
+        if response.status_code == 304 and cached:
+            _remember_access(key, cached[1], cached[2])
+            return cached[1]
+        elif response.status_code == 200:
+            # The request is unauthenticated, so GitHub only answers 200 for
+            # public repositories (private ones are reported as 404)
+            logger.info(f"Repository {owner}/{repo} accessibility check: public")
+            _remember_access(key, True, response.headers.get('ETag'))
+            return True
+        elif response.status_code == 404:
+            logger.warning(f"Repository not found or private: {url}")
+            _remember_access(key, False, None)
+            return False
+        elif response.status_code in (403, 429):
+            logger.warning(f"GitHub API rate limited or access denied for {url}")
+            _note_rate_limit(response)
+            # Return True for rate limit issues - assume repo is accessible
+            return True
+        else:
+            logger.warning(f"GitHub API error {response.status_code} for {url}")
+            # For other errors, assume accessible to avoid blocking valid URLs
+            return True
+    
     except requests.exceptions.RequestException as e:
         logger.warning(f"Network error checking repository accessibility: {e}")
+        # Don't stall every validation on an unreachable API; retry in a while
+        _api_backoff_until = time.monotonic() + _NETWORK_BACKOFF
         # Network issues shouldn't block URL validation
         return True
     except Exception as e:
         logger.warning(f"Error checking repository accessibility: {e}")
         return True
-    
-    return True  # Default to accessible if we can't determine otherwise
 
 
-def validate_file_path(file_path: str, allowed_extensions: Optional[List[str]] = None) -> str:
+@functools.lru_cache(maxsize=32)
+def _normalize_exts(extensions: Tuple[str, ...]) -> FrozenSet[str]:
+    """Lower-cased extensions without the leading dot, computed once per list"""
+    return frozenset(e.lstrip('.').lower() for e in extensions)
+
+
+def validate_file_path(file_path: str, allowed_extensions: Optional[Iterable[str]] = None) -> str:
     """
     Validate file path for security
     
     Args:
         file_path: File path to validate
-        allowed_extensions: List of allowed file extensions
+        allowed_extensions: Allowed file extensions, with or without the dot
         
     Returns:
         Sanitized file path
@@ -168,14 +351,14 @@ def validate_file_path(file_path: str, allowed_extensions: Optional[List[str]] =
         raise SecurityViolationError("Directory traversal detected in file path")
     
     # Check for suspicious characters
-    if re.search(r'[;&|`$<>]', file_path):
+    if not _BAD_PATH_CHARS.isdisjoint(file_path):
         raise SecurityViolationError("File path contains suspicious characters")
     
     # Validate extension if specified
     if allowed_extensions:
         _, ext = os.path.splitext(file_path.lower())
         ext = ext.lstrip('.')
-        if ext not in [e.lstrip('.') for e in allowed_extensions]:
+        if ext not in _normalize_exts(tuple(allowed_extensions)):
             raise ValidationError(f"File extension '{ext}' not allowed. Allowed: {allowed_extensions}")
     
     return file_path
@@ -199,12 +382,23 @@ def validate_conversation_id(conv_id: str) -> str:
     
     conv_id = conv_id.strip()
     
-    # Should be UUID-like format
-    uuid_pattern = r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$'
-    if not re.match(uuid_pattern, conv_id, re.IGNORECASE):
+    # Should be UUID-like format; the length and dash positions reject most
+    # malformed IDs before parsing
+    if (len(conv_id) != 36 or conv_id[8] != '-' or conv_id[13] != '-'
+            or conv_id[18] != '-' or conv_id[23] != '-'):
+        raise ValidationError("Conversation ID must be in UUID format")
+    
+    try:
+        canonical = str(uuid.UUID(conv_id))
+    except ValueError:
         raise ValidationError("Conversation ID must be in UUID format")
     
-    return conv_id.lower()
+    # UUID() also tolerates forms like a leading '+' or '_' separators; only
+    # IDs already in canonical form (up to case) are accepted
+    if canonical != conv_id.lower():
+        raise ValidationError("Conversation ID must be in UUID format")
+    
+    return canonical
 
 
 def sanitize_user_input(user_input: str, max_length: int = 10000) -> str:
@@ -228,20 +422,55 @@ def sanitize_user_input(user_input: str, max_length: int = 10000) -> str:
         raise ValidationError(f"Input too long. Maximum {max_length} characters allowed")
     
     # Remove potentially dangerous patterns
-    dangerous_patterns = [
-        (r'<script[^>]*>.*?</script>', ''),  # Script tags
-        (r'javascript:', ''),  # JavaScript URLs
-        (r'on\w+\s*=', ''),  # Event handlers
-        (r'<iframe[^>]*>.*?</iframe>', ''),  # Iframes
-        (r'<object[^>]*>.*?</object>', ''),  # Objects
-        (r'<embed[^>]*>.*?</embed>', ''),  # Embeds
-    ]
+    if not any(trigger in user_input for trigger in _DANGEROUS_TRIGGERS):
+        return user_input
     
+    # Repeat until nothing changes: removing one construct can join the text
+    # around it into another (e.g. "onjavascript:error=" -> "onerror=")
     sanitized = user_input
-    for pattern, replacement in dangerous_patterns:
-        sanitized = re.sub(pattern, replacement, sanitized, flags=re.IGNORECASE | re.DOTALL)
-    
-    return sanitized
+    while True:
+        cleaned = _strip_blocked_elements(sanitized)
+        cleaned = _JS_URL_RE.sub('', cleaned)
+        cleaned = _strip_event_handlers(cleaned)
+        if cleaned == sanitized:
+            return sanitized
+        sanitized = cleaned
+
+
+def _strip_blocked_elements(text: str) -> str:
+    """Remove <tag ...>...</tag> spans of blocked elements in one forward scan"""
+    for open_re, close_re in _BLOCKED_ELEMENT_RES:
+        pieces = []
+        pos = 0
+        while True:
+            opening = open_re.search(text, pos)
+            if not opening:
+                break
+            tag_end = text.find('>', opening.end())
+            closing = close_re.search(text, tag_end + 1) if tag_end >= 0 else None
+            if not closing:
+                # No later opening tag can be closed either
+                break
+            pieces.append(text[pos:opening.start()])
+            pos = closing.end()
+        if pieces:
+            pieces.append(text[pos:])
+            text = ''.join(pieces)
+    return text
+
+
+def _strip_event_handlers(text: str) -> str:
+    """Remove on<name>= event handler attributes"""
+    if _RE2_EVENT_HANDLER_RE is not None:
+        return _RE2_EVENT_HANDLER_RE.sub('', text)
+    return _WORD_ASSIGN_RE.sub(_drop_event_handler, text)
+
+
+def _drop_event_handler(match: re.Match) -> str:
+    """Cut an "on<name>=" handler, and any following whitespace, out of a word"""
+    word = match.group(1)
+    handler = _ON_PREFIX_RE.search(word)
+    return match.group(0) if handler is None else word[:handler.start()]
 
 
 def validate_mcp_message(message: Dict[str, Any]) -> Dict[str, Any]:
@@ -260,17 +489,16 @@ def validate_mcp_message(message: Dict[str, Any]) -> Dict[str, Any]:
     if not isinstance(message, dict):
         raise ValidationError("Message must be a dictionary")
     
-    # Required fields
-    required_fields = ['type', 'role', 'name', 'content', 'metadata']
-    for field in required_fields:
-        if field not in message:
-            raise ValidationError(f"Missing required field: {field}")
+    # Required fields, all reported at once
+    missing = _REQUIRED_FIELDS.difference(message)
+    if missing:
+        raise ValidationError(f"Missing required fields: {', '.join(sorted(missing))}")
     
     # Validate field types and values
     if message['type'] != 'message':
         raise ValidationError("Message type must be 'message'")
     
-    if message['role'] not in ['agent', 'user', 'system']:
+    if message['role'] not in _ALLOWED_ROLES:
         raise ValidationError("Invalid role. Must be 'agent', 'user', or 'system'")
     
     if not isinstance(message['name'], str) or not message['name'].strip():
@@ -284,28 +512,65 @@ def validate_mcp_message(message: Dict[str, Any]) -> Dict[str, Any]:
     
     # Validate metadata structure
     metadata = message['metadata']
-    if 'timestamp' not in metadata or 'conversation_id' not in metadata:
-        raise ValidationError("Metadata missing required fields: timestamp, conversation_id")
+    missing = _REQUIRED_METADATA.difference(metadata)
+    if missing:
+        raise ValidationError(f"Metadata missing required fields: {', '.join(sorted(missing))}")
     
     # Sanitize string values in content
-    sanitized_message = message.copy()
-    sanitized_content = {}
-    
-    for key, value in message['content'].items():
-        if isinstance(value, str):
-            if key in ['repo_url']:
-                sanitized_content[key] = validate_github_url(value)
-            elif key in ['user_md']:
-                sanitized_content[key] = sanitize_user_input(value)
-            elif key in ['md_path', 'pdf_path']:
-                sanitized_content[key] = validate_file_path(value, ['.md', '.pdf'])
-            else:
-                sanitized_content[key] = value[:1000]  # Limit other strings
-        else:
-            sanitized_content[key] = value
+    sanitized_content = {
+        key: _sanitize_content_value(key, value) if isinstance(value, str) else value
+        for key, value in message['content'].items()
+    }
     
-    sanitized_message['content'] = sanitized_content
-    return sanitized_message
+    return {**message, 'content': sanitized_content}
+
+
+def validate_messages_batch(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Validate a batch of MCP messages, probing their repositories concurrently
+    
+    Messages are validated in order first (cheap, and the first invalid one
+    raises before any network call); the repositories they reference are then
+    probed on a thread pool instead of one round trip after another.
+    
+    Args:
+        messages: MCP messages to validate
+        
+    Returns:
+        Validated messages, in the same order
+        
+    Raises:
+        ValidationError: If a message structure is invalid
+    """
+    validated = [validate_mcp_message(message) for message in messages]
+    
+    repos = {}
+    for message in validated:
+        url = message['content'].get('repo_url')
+        if isinstance(url, str):
+            # Already format-checked above, so this is a cache hit
+            url, owner, repo = _validate_github_url_cached(url)
+            repos[url] = (owner, repo)
+    
+    if repos:
+        # Leaving the block waits for every probe; _check_accessibility never raises
+        with ThreadPoolExecutor(max_workers=min(8, len(repos))) as pool:
+            for url, (owner, repo) in repos.items():
+                pool.submit(_check_accessibility, url, owner, repo)
+    
+    return validated
+
+
+def _sanitize_content_value(key: str, value: str) -> str:
+    """Validate or sanitize one string field of an MCP message's content"""
+    if key == 'repo_url':
+        # Format and security only; clone_repo probes the repository itself
+        return validate_github_url(value, check_accessible=False)
+    if key == 'user_md':
+        return sanitize_user_input(value)
+    if key in _MD_PATH_KEYS:
+        return validate_file_path(value, _MD_PDF_EXTS)
+    return value[:1000]  # Limit other strings
 
 
 def check_rate_limits(user_id: str, action: str, limits: Dict[str, tuple]) -> bool: